@@ -2190,12 +2190,15 @@ async def get_submissions(
         per_page: Number of submissions per page (1-100)
     """
     try:
-        result = canvas_service.get_submissions_for_assignment(
-            course_id=course_id,
-            assignment_id=assignment_id,
-            include=include,
-            per_page=per_page
-        )
+        try:
+            result = await canvas_service.get_submissions_for_assignment_async(
+                course_id=course_id,
+                assignment_id=assignment_id,
+                include=include,
+                per_page=per_page
+            )
+        finally:
+            await canvas_service.aclose()
         return result
     except Exception as e:
         logger.error(f"Error getting submissions: {str(e)}")
@@ -2302,12 +2305,15 @@ async def direct_get_submissions(
         )
         
         # Get submissions
-        result = canvas_service.get_submissions_for_assignment(
-            course_id=course_id,
-            assignment_id=assignment_id,
-            include=include,
-            per_page=per_page
-        )
+        try:
+            result = await canvas_service.get_submissions_for_assignment_async(
+                course_id=course_id,
+                assignment_id=assignment_id,
+                include=include,
+                per_page=per_page
+            )
+        finally:
+            await canvas_service.aclose()
         
         return result
     except Exception as e:
@@ -2467,7 +2473,7 @@ async def get_canvas_submissions(
                 "message": "Canvas not initialized. Please initialize with credentials first."
             }
         
-        submissions = canvas_service_global.get_submissions_for_assignment(
+        submissions = await canvas_service_global.get_submissions_for_assignment_async(
             course_id, 
             assignment_id,
             include=include
@@ -2912,11 +2918,14 @@ async def get_canvas_submissions_by_post(
             }
         
         # Get submissions using the Canvas service
-        result = canvas_service.get_submissions_for_assignment(
-            course_id=int(course_id),
-            assignment_id=int(assignment_id),
-            include=['user', 'attachments']
-        )
+        try:
+            result = await canvas_service.get_submissions_for_assignment_async(
+                course_id=int(course_id),
+                assignment_id=int(assignment_id),
+                include=['user', 'attachments']
+            )
+        finally:
+            await canvas_service.aclose()
         
         if result.get('success', False):
             return {
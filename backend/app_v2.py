@@ -306,7 +306,7 @@ def _handle_chat_input(prompt, results, processed_files):
                 - Student: {student}
                 - Score: {student_data['score']}/{student_data['total']}
                 - Feedback: {student_data['grading_feedback']}
-                - Deductions: {json.dumps(student_data.get('mistakes', {}), indent=2)}
+                - Deductions: {json.dumps(student_data.get('mistakes', {}), separators=(',', ':'))}
                 
                 Current Query: {prompt}
                 """]
@@ -6,6 +6,10 @@ import cv2
 import numpy as np
 import logging
 import subprocess
+import multiprocessing
+import multiprocessing.pool
+import threading
+import atexit
 import json
 from datetime import datetime
 from pathlib import Path
@@ -15,6 +19,10 @@ from dotenv import load_dotenv
 load_dotenv()
 OCR_ENGINE = os.getenv("OCR_ENGINE", "opensource").lower()
 
+# Render resolution for the neural OCR engines (PaddleOCR, EasyOCR); their detectors
+# scale with image area and read printed text reliably at 150 DPI
+NEURAL_OCR_DPI = int(os.getenv("NEURAL_OCR_DPI", "150"))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -55,6 +63,12 @@ except ImportError:
     logger.warning("pytesseract package not installed. Tesseract will not be available.")
     tesseract_available = False
 
+# Page preprocessing and the tesserocr engine live in ocr_worker, which the pool
+# workers import instead of this module and its OCR models
+import ocr_worker
+from ocr_worker import preprocess_image
+tesserocr_available = tesseract_available and ocr_worker.tesserocr_available
+
 # EasyOCR imports
 try:
     import easyocr
@@ -133,55 +147,6 @@ def save_extraction_data(file_path: str, images: List[np.ndarray], preprocessed_
         logger.error(f"Failed to save extraction data: {e}")
         return ""
 
-def preprocess_image(image: np.ndarray) -> np.ndarray:
-    """
-    Preprocess an image to improve OCR quality.
-    
-    Args:
-        image: Input image as a numpy array
-        
-    Returns:
-        Processed image as a numpy array
-    """
-    # Convert to grayscale if it's not already
-    if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    else:
-        gray = image
-    
-    # Apply threshold to get black and white image
-    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    
-    # Denoise image
-    try:
-        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
-    except Exception as e:
-        logger.warning(f"Denoising failed, using original binary image: {e}")
-        denoised = binary
-    
-    # Detect and correct skew if necessary
-    try:
-        coords = np.column_stack(np.where(denoised > 0))
-        angle = cv2.minAreaRect(coords)[-1]
-        
-        if angle < -45:
-            angle = -(90 + angle)
-        else:
-            angle = -angle
-            
-        # Only correct if skew is significant
-        if abs(angle) > 0.5:
-            (h, w) = denoised.shape[:2]
-            center = (w // 2, h // 2)
-            M = cv2.getRotationMatrix2D(center, angle, 1.0)
-            denoised = cv2.warpAffine(denoised, M, (w, h), 
-                                     flags=cv2.INTER_CUBIC, 
-                                     borderMode=cv2.BORDER_REPLICATE)
-    except Exception as e:
-        logger.warning(f"Skew correction failed: {e}")
-    
-    return denoised
-
 def convert_pdf_to_images(pdf_path: str, dpi: int = 300) -> List[np.ndarray]:
     """
     Convert PDF pages to images for preprocessing.
@@ -243,6 +208,81 @@ def extract_with_unstructured(file_path: str) -> str:
         logger.error(f"UnstructuredIO extraction failed: {e}")
         return ""
 
+# Persistent pool of worker processes that import only ocr_worker. With tesserocr installed
+# each holds one initialized Tesseract engine, and since Tesseract runs up to 4 threads
+# internally, the pool is sized to leave room for them.
+_OCR_WORKERS = max(1, (os.cpu_count() or 1) // 4)
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def _get_ocr_pool() -> multiprocessing.pool.Pool:
+    """Return the shared OCR worker pool, starting it on first use."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = multiprocessing.get_context("spawn").Pool(
+                processes=_OCR_WORKERS,
+                initializer=ocr_worker.init_tesserocr_worker,
+                initargs=(os.getenv("TESSDATA_PREFIX"),)
+            )
+            atexit.register(_ocr_pool.terminate)
+        return _ocr_pool
+
+def _map_pages(func, images: List[np.ndarray]) -> list:
+    """
+    Apply an ocr_worker function to every page image.
+    
+    Pages go to the shared pool, except inside a worker process (such as a
+    preprocessing_v2 submission worker), where they run in-process rather than
+    starting a pool of their own.
+    
+    Args:
+        func: ocr_worker function to apply
+        images: Page images as numpy arrays
+        
+    Returns:
+        Results in page order
+    """
+    if multiprocessing.parent_process() is not None:
+        return [func(image) for image in images]
+    return _get_ocr_pool().map(func, images)
+
+def _tesseract_ocr_batch(images: List[np.ndarray]) -> List[str]:
+    """
+    Run a single Tesseract process over several page images.
+    
+    The pages are written to a temporary directory and passed to Tesseract as an
+    image-list file, so the engine starts once instead of once per page. Tesseract
+    separates the text of consecutive images with a form feed.
+    
+    Args:
+        images: Preprocessed page images as numpy arrays
+        
+    Returns:
+        Extracted text, one entry per image
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_paths = []
+        for i, image in enumerate(images):
+            image_path = os.path.join(tmp_dir, f"page_{i:04d}.png")
+            cv2.imwrite(image_path, image)
+            image_paths.append(image_path)
+        
+        list_path = os.path.join(tmp_dir, "images.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(image_paths) + "\n")
+        
+        output = pytesseract.image_to_string(list_path, lang='eng')
+    
+    page_texts = output.split('\f')
+    # Every page is followed by a form feed, leaving an empty trailing entry
+    if len(page_texts) == len(images) + 1:
+        page_texts.pop()
+    if len(page_texts) != len(images):
+        logger.warning(f"Tesseract returned {len(page_texts)} pages for {len(images)} images")
+        return [output]
+    return page_texts
+
 def extract_with_tesseract(file_path: str, save_data: bool = True) -> str:
     """
     Extract text using Tesseract OCR.
@@ -268,20 +308,25 @@ def extract_with_tesseract(file_path: str, save_data: bool = True) -> str:
                 logger.error("Failed to extract images from PDF")
                 return ""
                 
-            results = []
-            preprocessed_images = []
-            
-            for image in images:
-                # Preprocess image
-                processed_img = preprocess_image(image)
-                preprocessed_images.append(processed_img)
+            # Workers with a loaded engine are reused across documents
+            if tesserocr_available:
+                page_results = _map_pages(ocr_worker.tesserocr_ocr_page, images)
+                extracted_text = "\n\n".join(page_text for _, page_text in page_results)
                 
-                # Convert to PIL Image for Tesseract
-                pil_image = PIL.Image.fromarray(processed_img)
+                if save_data:
+                    preprocessed_images = [processed_img for processed_img, _ in page_results]
+                    save_extraction_data(file_path, images, preprocessed_images, extracted_text, "tesseract")
                 
-                # Run OCR
-                page_text = pytesseract.image_to_string(pil_image, lang='eng')
-                results.append(page_text)
+                return extracted_text
+            
+            # Preprocessing is CPU-bound, so fan pages out across the worker processes
+            if len(images) > 1:
+                preprocessed_images = _map_pages(preprocess_image, images)
+            else:
+                preprocessed_images = [preprocess_image(image) for image in images]
+            
+            # OCR every page with one Tesseract invocation
+            results = _tesseract_ocr_batch(preprocessed_images)
             
             extracted_text = "\n\n".join(results)
             
@@ -337,7 +382,7 @@ def extract_with_paddleocr(file_path: str, save_data: bool = True) -> str:
         
         # For PDFs, we need to convert to images first
         if file_path.lower().endswith('.pdf'):
-            images = convert_pdf_to_images(file_path)
+            images = convert_pdf_to_images(file_path, dpi=NEURAL_OCR_DPI)
             results = []
             preprocessed_images = []
             
@@ -439,15 +484,15 @@ def extract_with_easyocr(file_path: str) -> str:
         
         # For PDFs, we need to convert to images first
         if file_path.lower().endswith('.pdf'):
-            images = convert_pdf_to_images(file_path)
+            images = convert_pdf_to_images(file_path, dpi=NEURAL_OCR_DPI)
             results = []
             
             for image in images:
                 # Preprocess image
                 processed_img = preprocess_image(image)
                 
-                # Run OCR
-                result = easy_ocr_reader.readtext(processed_img)
+                # Run OCR on the single-channel uint8 image with the greedy decoder
+                result = easy_ocr_reader.readtext(processed_img, decoder='greedy')
                 
                 # Extract text from result
                 page_text = []
@@ -45,6 +45,9 @@ HEADERS_FLAN_T5 = {"Authorization": f"Bearer {HF_FLAN_T5_URL}"}
 # Global flag to track network availability
 NETWORK_AVAILABLE = True
 
+# Outermost {...} span in a model response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
 def _extract_json_snippet(text: str) -> Optional[str]:
     """
     Extract a JSON object from text using multiple strategies.
@@ -54,7 +57,7 @@ def _extract_json_snippet(text: str) -> Optional[str]:
         return None
         
     # Strategy 1: Use regex to find JSON patterns
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    json_match = _JSON_RE.search(text)
     if json_match:
         return json_match.group(0)
     
@@ -150,7 +153,7 @@ def grade_submission(
                     logger.info("Grading with Gemini model")
                     
                     # Extract JSON from response
-                    json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+                    json_match = _JSON_RE.search(response.text)
                     if json_match:
                         json_content = json_match.group(0)
                         try:
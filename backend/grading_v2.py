@@ -20,6 +20,9 @@ from prompts.image_prompt import get_image_description_prompt
 from models.rubric import Rubric, GradingCriteria
 import os
 
+# Outermost {...} span in a model response
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
 class GradingResult:
     """Class to store and format grading results."""
     
@@ -192,7 +195,7 @@ class GradingService:
             response = self.model.generate_content(prompt)
             
             # Extract JSON content from the response
-            json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+            json_match = _JSON_RE.search(response.text)
             if not json_match:
                 raise ValueError("No JSON content found in the response")
 
@@ -3,7 +3,20 @@ Rubric model for ScorePAL grading system.
 """
 
 from typing import Dict, List, Optional, Union, Any
-from datetime import datetime
+from datetime import datetime, timezone
+import json
+
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
+
+def now_iso() -> str:
+    """Current UTC time as an ISO 8601 string with whole-second precision."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
 
 class GradingCriteria:
     """A single grading criterion within a rubric."""
@@ -84,8 +97,19 @@ class Rubric:
         self.criteria = criteria
         self.strictness = max(0.0, min(1.0, strictness))  # Ensure between 0 and 1
         self.id = id or f"rubric_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        self.created_at = created_at or datetime.now().isoformat()
+        self.created_at = created_at or now_iso()
         self.updated_at = updated_at or self.created_at
+        
+        # to_dict()/to_json_bytes() results, reused until a field is assigned
+        self._cached_dict = None
+        self._cached_bytes = None
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Assigning any field invalidates the cached serializations
+        if not name.startswith("_cached"):
+            self.__dict__["_cached_dict"] = None
+            self.__dict__["_cached_bytes"] = None
+        object.__setattr__(self, name, value)
     
     @property
     def total_points(self) -> int:
@@ -93,7 +117,29 @@ class Rubric:
         return sum(criterion.max_points for criterion in self.criteria)
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary representation."""
+        """
+        Convert to dictionary representation.
+        
+        The dictionary is built once and cached until a field of the rubric is
+        assigned; callers get a shallow copy, so adding or replacing keys doesn't
+        affect the cache. Criteria changed in place aren't detected, so assign
+        ``criteria`` again after editing them.
+        """
+        if self._cached_dict is None:
+            self._cached_dict = self._build_dict()
+        return dict(self._cached_dict)
+    
+    def to_json_bytes(self) -> bytes:
+        """Return the compact JSON encoding of to_dict(), cached like to_dict()."""
+        if self._cached_bytes is None:
+            data = self.to_dict()
+            if orjson_available:
+                self._cached_bytes = orjson.dumps(data)
+            else:
+                self._cached_bytes = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return self._cached_bytes
+    
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "name": self.name,
@@ -106,12 +152,18 @@ class Rubric:
         }
     
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Rubric':
-        """Create a Rubric from a dictionary."""
-        criteria = [
-            GradingCriteria.from_dict(criterion_data) 
-            for criterion_data in data.get("criteria", [])
-        ]
+    def from_dict(cls, data: Dict[str, Any], criteria: Optional[List[GradingCriteria]] = None) -> 'Rubric':
+        """
+        Create a Rubric from a dictionary.
+        
+        Pass criteria to use already built GradingCriteria objects instead of
+        parsing data["criteria"].
+        """
+        if criteria is None:
+            criteria = [
+                GradingCriteria.from_dict(criterion_data) 
+                for criterion_data in data.get("criteria", [])
+            ]
         
         return cls(
             name=data.get("name", ""),
@@ -12,6 +12,7 @@ Options:
 """
 
 import os
+import re
 import argparse
 import time
 from dotenv import load_dotenv
@@ -22,6 +23,9 @@ from extraction_service_v2 import extract_pdf_text
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Matches a single whitespace-delimited word
+_WORD_RE = re.compile(r'\S+')
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Extract text from PDF files with high accuracy')
     parser.add_argument('--file', required=True, help='Path to the PDF file to process')
@@ -54,7 +58,7 @@ def main():
         # Print statistics
         processing_time = time.time() - start_time
         char_count = len(extracted_text)
-        word_count = len(extracted_text.split())
+        word_count = sum(1 for _ in _WORD_RE.finditer(extracted_text))
         
         logger.info(f"Text extraction completed in {processing_time:.2f} seconds")
         logger.info(f"Extracted {char_count} characters, {word_count} words")
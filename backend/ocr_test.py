@@ -4,82 +4,169 @@ OCR Performance Test Script
 Tests all available OCR engines and provides performance comparison.
 
 Usage:
-  python ocr_test.py --file <path_to_pdf> [--output-dir <output_directory>]
+  python ocr_test.py --file <path_to_pdf> [<path_or_glob_or_dir> ...] [--output-dir <output_directory>] [--parallel]
 """
 
 import os
+import io
+import importlib.util
+import re
+import sys
+import glob
 import argparse
+import multiprocessing
 import time
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 import logging
 
-# Import OCR functions
-from extraction_service_v2 import (
-    extract_with_tesseract, extract_with_paddleocr, extract_with_easyocr,
-    extract_with_unstructured, detect_document_type,
-    tesseract_available, paddle_available, easyocr_available, unstructured_available
-)
+# OCR engine availability, checked without importing extraction_service_v2, which
+# loads every engine's models at import time; engine functions are imported on demand
+tesseract_available = all(importlib.util.find_spec(name) is not None for name in ("pytesseract", "PIL"))
+paddle_available = importlib.util.find_spec("paddleocr") is not None
+easyocr_available = importlib.util.find_spec("easyocr") is not None
+unstructured_available = importlib.util.find_spec("unstructured") is not None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_ocr_engine(engine_name: str, extract_func, file_path: str) -> Dict:
-    """Test a single OCR engine and return performance metrics."""
+# Parquet output (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    pyarrow_available = True
+except ImportError:
+    logger.warning("pyarrow package not installed. Results will be saved as JSON and text files.")
+    pyarrow_available = False
+
+# Matches a single whitespace-delimited word
+_WORD_RE = re.compile(r'\S+')
+
+# Engines that can use a GPU when one is configured; the rest are CPU-only
+GPU_ENGINES = {"PaddleOCR", "EasyOCR"}
+
+def test_ocr_engine(engine_name: str, extract_func, file_path: str, keep_text: bool = False) -> Dict:
+    """
+    Test a single OCR engine and return performance metrics.
+    
+    The result always carries the first 100 characters as ``text_sample``; the
+    full extracted text is only kept (as ``full_text``) when ``keep_text`` is
+    set, otherwise ``full_text`` is None.
+    """
     logger.info(f"Testing {engine_name}...")
     
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
+    start_cpu = time.process_time_ns()
     try:
         extracted_text = extract_func(file_path)
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
+        cpu_time = (time.process_time_ns() - start_cpu) / 1e9
         
         # Calculate metrics
         char_count = len(extracted_text)
-        word_count = len(extracted_text.split())
-        line_count = len(extracted_text.split('\n'))
+        word_count = sum(1 for _ in _WORD_RE.finditer(extracted_text))
+        line_count = extracted_text.count('\n') + 1
         
         return {
             "engine": engine_name,
             "success": True,
             "processing_time": round(processing_time, 2),
+            "cpu_time": round(cpu_time, 2),
             "character_count": char_count,
             "word_count": word_count,
             "line_count": line_count,
-            "text_sample": extracted_text[:200] + "..." if len(extracted_text) > 200 else extracted_text,
-            "full_text": extracted_text,
+            "text_sample": extracted_text[:100] + "..." if len(extracted_text) > 100 else extracted_text,
+            "full_text": extracted_text if keep_text else None,
             "error": None
         }
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
+        cpu_time = (time.process_time_ns() - start_cpu) / 1e9
         logger.error(f"{engine_name} failed: {str(e)}")
         return {
             "engine": engine_name,
             "success": False,
             "processing_time": round(processing_time, 2),
+            "cpu_time": round(cpu_time, 2),
             "character_count": 0,
             "word_count": 0,
             "line_count": 0,
             "text_sample": "",
-            "full_text": "",
+            "full_text": None,
             "error": str(e)
         }
 
-def run_comprehensive_test(file_path: str, output_dir: str = None) -> Dict:
+def write_output_files(pending_writes: List[Tuple[Path, bytes]]) -> None:
+    """Write pre-encoded output files, issuing a single write call per file."""
+    for path, data in pending_writes:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+
+def run_engines_in_parallel(engines_to_test: List[Tuple], file_path: str, keep_text: bool) -> List[Dict]:
+    """
+    Run each OCR engine in its own spawned worker process.
+    
+    Workers are started with the ``spawn`` method, since forking after CUDA
+    initialization is unsafe. Each worker gets its own CUDA_VISIBLE_DEVICES:
+    GPU engines are spread round-robin over OCR_NUM_GPUS devices and
+    CPU-only engines get an empty value so they never touch a GPU context.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    num_gpus = int(os.getenv("OCR_NUM_GPUS", "0"))
+    previous_devices = os.environ.get("CUDA_VISIBLE_DEVICES")
+    executors = []
+    futures = []
+    gpu_index = 0
+    
+    try:
+        for engine_name, extract_func in engines_to_test:
+            if engine_name in GPU_ENGINES and num_gpus > 0:
+                devices = str(gpu_index % num_gpus)
+                gpu_index += 1
+            else:
+                devices = ""
+            
+            # The worker is spawned inside submit() and inherits this environment,
+            # which must be in place before the engine libraries are imported
+            os.environ["CUDA_VISIBLE_DEVICES"] = devices
+            executor = ProcessPoolExecutor(max_workers=1, mp_context=ctx)
+            executors.append(executor)
+            futures.append(executor.submit(test_ocr_engine, engine_name, extract_func, file_path, keep_text))
+        
+        return [future.result() for future in futures]
+    finally:
+        if previous_devices is None:
+            os.environ.pop("CUDA_VISIBLE_DEVICES", None)
+        else:
+            os.environ["CUDA_VISIBLE_DEVICES"] = previous_devices
+        for executor in executors:
+            executor.shutdown()
+
+def run_comprehensive_test(file_path: str, output_dir: str = None, parallel: bool = False) -> Dict:
     """Run comprehensive OCR test on all available engines."""
     
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+    # os.stat raises FileNotFoundError for missing files
+    file_stat = os.stat(file_path)
     
     # Detect document type
+    from extraction_service_v2 import detect_document_type
     doc_type = detect_document_type(file_path)
     logger.info(f"Detected document type: {doc_type}")
     
     # Prepare test results
     results = {
         "file_path": file_path,
+        "file_size": file_stat.st_size,
         "document_type": doc_type,
         "test_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
         "engines_tested": [],
@@ -91,15 +178,19 @@ def run_comprehensive_test(file_path: str, output_dir: str = None) -> Dict:
     engines_to_test = []
     
     if tesseract_available:
+        from extraction_service_v2 import extract_with_tesseract
         engines_to_test.append(("Tesseract", extract_with_tesseract))
     
     if paddle_available:
+        from extraction_service_v2 import extract_with_paddleocr
         engines_to_test.append(("PaddleOCR", extract_with_paddleocr))
     
     if easyocr_available:
+        from extraction_service_v2 import extract_with_easyocr
         engines_to_test.append(("EasyOCR", extract_with_easyocr))
     
     if unstructured_available:
+        from extraction_service_v2 import extract_with_unstructured
         engines_to_test.append(("UnstructuredIO", extract_with_unstructured))
     
     if not engines_to_test:
@@ -107,18 +198,31 @@ def run_comprehensive_test(file_path: str, output_dir: str = None) -> Dict:
         return results
     
     # Run tests
-    for engine_name, extract_func in engines_to_test:
-        result = test_ocr_engine(engine_name, extract_func, file_path)
-        results["engine_results"].append(result)
-        results["engines_tested"].append(engine_name)
+    if parallel:
+        results["engine_results"] = run_engines_in_parallel(engines_to_test, file_path, bool(output_dir))
+        results["engines_tested"] = [engine_name for engine_name, _ in engines_to_test]
+    else:
+        for engine_name, extract_func in engines_to_test:
+            result = test_ocr_engine(engine_name, extract_func, file_path, keep_text=bool(output_dir))
+            results["engine_results"].append(result)
+            results["engines_tested"].append(engine_name)
     
     # Generate summary
     successful_results = [r for r in results["engine_results"] if r["success"]]
     
     if successful_results:
-        # Find best performing engine
-        best_by_content = max(successful_results, key=lambda x: x["character_count"])
-        fastest_engine = min(successful_results, key=lambda x: x["processing_time"])
+        # Find best performing engines and throughput in a single pass
+        best_by_content = fastest_engine = successful_results[0]
+        total_chars = 0
+        total_time = 0.0
+        for r in successful_results:
+            if r["character_count"] > best_by_content["character_count"]:
+                best_by_content = r
+            if r["processing_time"] < fastest_engine["processing_time"]:
+                fastest_engine = r
+            r["chars_per_second"] = round(r["character_count"] / r["processing_time"], 2) if r["processing_time"] else 0
+            total_chars += r["character_count"]
+            total_time += r["processing_time"]
         
         results["summary"] = {
             "total_engines_tested": len(engines_to_test),
@@ -133,7 +237,10 @@ def run_comprehensive_test(file_path: str, output_dir: str = None) -> Dict:
                 "engine": fastest_engine["engine"],
                 "processing_time": fastest_engine["processing_time"]
             },
-            "recommended_engine": best_by_content["engine"]
+            "recommended_engine": best_by_content["engine"],
+            "total_characters": total_chars,
+            "total_processing_time": round(total_time, 2),
+            "average_chars_per_second": round(total_chars / total_time, 2) if total_time else 0
         }
     else:
         results["summary"] = {
@@ -147,17 +254,44 @@ def run_comprehensive_test(file_path: str, output_dir: str = None) -> Dict:
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
         
-        # Save detailed results
+        if pyarrow_available:
+            # Store metrics and text once in a columnar file; the JSON keeps only the summary
+            engine_results = results["engine_results"]
+            table = pa.table({
+                "engine": [r["engine"] for r in engine_results],
+                "success": [r["success"] for r in engine_results],
+                "processing_time": [r["processing_time"] for r in engine_results],
+                "cpu_time": [r["cpu_time"] for r in engine_results],
+                "char_count": [r["character_count"] for r in engine_results],
+                "word_count": [r["word_count"] for r in engine_results],
+                "line_count": [r["line_count"] for r in engine_results],
+                "text": [r["full_text"] for r in engine_results],
+            })
+            pq.write_table(table, Path(output_dir) / "ocr_results.parquet",
+                           compression='zstd', compression_level=3)
+            json_results = dict(results)
+            json_results["engine_results"] = [
+                {k: v for k, v in r.items() if k != "full_text"} for r in engine_results
+            ]
+        else:
+            json_results = results
+        
+        # Stream detailed results to disk chunk by chunk instead of building one large string
         results_file = Path(output_dir) / "ocr_test_results.json"
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
         with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+            for chunk in encoder.iterencode(json_results):
+                f.write(chunk)
         
-        # Save extracted text from each engine
-        for result in results["engine_results"]:
-            if result["success"] and result["full_text"]:
-                text_file = Path(output_dir) / f"{result['engine']}_extracted_text.txt"
-                with open(text_file, 'w', encoding='utf-8') as f:
-                    f.write(result["full_text"])
+        if not pyarrow_available:
+            # Collect each engine's text and write it in one batch
+            pending_writes = []
+            for result in results["engine_results"]:
+                if result["success"] and result["full_text"]:
+                    text_file = Path(output_dir) / f"{result['engine']}_extracted_text.txt"
+                    pending_writes.append((text_file, result["full_text"].encode('utf-8')))
+            
+            write_output_files(pending_writes)
         
         logger.info(f"Test results saved to: {output_dir}")
     
@@ -165,70 +299,118 @@ def run_comprehensive_test(file_path: str, output_dir: str = None) -> Dict:
 
 def print_test_summary(results: Dict):
     """Print a formatted summary of test results."""
-    print("\n" + "="*60)
-    print("OCR ENGINE PERFORMANCE TEST RESULTS")
-    print("="*60)
+    # Build the whole summary in memory and emit it with a single write
+    buffer = io.StringIO()
+    
+    def emit(line: str = ""):
+        buffer.write(line + "\n")
+    
+    emit("\n" + "="*60)
+    emit("OCR ENGINE PERFORMANCE TEST RESULTS")
+    emit("="*60)
     
-    print(f"File: {results['file_path']}")
-    print(f"Document Type: {results['document_type']}")
-    print(f"Test Time: {results['test_timestamp']}")
-    print()
+    emit(f"File: {results['file_path']}")
+    emit(f"Document Type: {results['document_type']}")
+    emit(f"Test Time: {results['test_timestamp']}")
+    emit()
     
     if "error" in results["summary"]:
-        print(f"❌ {results['summary']['error']}")
+        emit(f"❌ {results['summary']['error']}")
+        sys.stdout.write(buffer.getvalue())
         return
     
-    print("ENGINE PERFORMANCE:")
-    print("-" * 40)
+    emit("ENGINE PERFORMANCE:")
+    emit("-" * 40)
     
     for result in results["engine_results"]:
         status = "✅" if result["success"] else "❌"
-        print(f"{status} {result['engine']:<15} | "
-              f"Time: {result['processing_time']:<6}s | "
-              f"Chars: {result['character_count']:<6} | "
-              f"Words: {result['word_count']:<6}")
+        emit(f"{status} {result['engine']:<15} | "
+             f"Time: {result['processing_time']:<6}s | "
+             f"CPU: {result['cpu_time']:<6}s | "
+             f"Chars: {result['character_count']:<6} | "
+             f"Words: {result['word_count']:<6}")
         
         if not result["success"]:
-            print(f"   Error: {result['error']}")
+            emit(f"   Error: {result['error']}")
         elif result["text_sample"]:
-            print(f"   Sample: {result['text_sample'][:100]}...")
-        print()
+            emit(f"   Sample: {result['text_sample']}")
+        emit()
     
-    print("SUMMARY:")
-    print("-" * 40)
+    emit("SUMMARY:")
+    emit("-" * 40)
     summary = results["summary"]
-    print(f"✅ Successful engines: {summary['successful_engines']}/{summary['total_engines_tested']}")
+    emit(f"✅ Successful engines: {summary['successful_engines']}/{summary['total_engines_tested']}")
     
     if summary["successful_engines"] > 0:
-        print(f"🏆 Best content extraction: {summary['best_content_extraction']['engine']} "
-              f"({summary['best_content_extraction']['character_count']} chars)")
-        print(f"⚡ Fastest engine: {summary['fastest_engine']['engine']} "
-              f"({summary['fastest_engine']['processing_time']}s)")
-        print(f"💡 Recommended: {summary['recommended_engine']}")
+        emit(f"🏆 Best content extraction: {summary['best_content_extraction']['engine']} "
+             f"({summary['best_content_extraction']['character_count']} chars)")
+        emit(f"⚡ Fastest engine: {summary['fastest_engine']['engine']} "
+             f"({summary['fastest_engine']['processing_time']}s)")
+        emit(f"💡 Recommended: {summary['recommended_engine']}")
+    
+    sys.stdout.write(buffer.getvalue())
+    sys.stdout.flush()
+
+def collect_input_files(patterns: List[str]) -> List[str]:
+    """Expand file paths, glob patterns and directories (searched for PDFs) into a file list."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.extend(str(p) for p in sorted(Path(pattern).rglob('*.pdf')))
+        elif glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            files.append(pattern)
+    return files
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Test OCR engine performance')
-    parser.add_argument('--file', required=True, help='Path to the file to test')
+    parser.add_argument('--file', required=True, nargs='+',
+                        help='Files, glob patterns or directories of PDFs to test')
     parser.add_argument('--output-dir', help='Directory to save test results')
+    parser.add_argument('--parallel', action='store_true',
+                        help='Run each engine in its own spawned process')
     return parser.parse_args()
 
 def main():
     load_dotenv()
     
     args = parse_arguments()
+    files = collect_input_files(args.file)
+    if not files:
+        logger.error("No files matched the given --file arguments")
+        return 1
     
-    try:
-        # Run comprehensive test
-        results = run_comprehensive_test(args.file, args.output_dir)
-        
-        # Print summary
-        print_test_summary(results)
+    # Run every file in this process so the OCR models are only loaded once
+    file_summaries = []
+    exit_code = 0
+    for index, file_path in enumerate(files, 1):
+        output_dir = args.output_dir
+        if output_dir and len(files) > 1:
+            # Prefix the input's position, so same-named files from different directories don't collide
+            output_dir = str(Path(args.output_dir) / f"{index:03d}_{Path(file_path).stem}")
         
-    except Exception as e:
-        logger.error(f"Test failed: {str(e)}")
-        return 1
+        try:
+            # Run comprehensive test
+            results = run_comprehensive_test(file_path, output_dir, parallel=args.parallel)
+            
+            # Print summary
+            print_test_summary(results)
+            
+            file_summaries.append({"file_path": file_path, "output_dir": output_dir, "summary": results["summary"]})
+        except Exception as e:
+            logger.error(f"Test failed for {file_path}: {str(e)}")
+            exit_code = 1
+    
+    # Save a cross-file comparison when several files were tested
+    if args.output_dir and len(files) > 1:
+        os.makedirs(args.output_dir, exist_ok=True)
+        summary_file = Path(args.output_dir) / "ocr_test_summary.json"
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(file_summaries, f, indent=2, ensure_ascii=False)
+        logger.info(f"Cross-file summary saved to: {summary_file}")
     
-    return 0
+    return exit_code
 
 if __name__ == "__main__":
     exit(main()) 
\ No newline at end of file
@@ -0,0 +1,101 @@
+# ocr_worker.py
+"""
+Page-level OCR helpers that run in extraction_service_v2's worker processes.
+
+Spawned workers import this module instead of extraction_service_v2, so they
+only load OpenCV and Tesseract, not the PaddleOCR and EasyOCR models that
+extraction_service_v2 builds at import time.
+"""
+import logging
+import os
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import PIL.Image
+    import tesserocr
+    tesserocr_available = True
+except ImportError:
+    tesserocr_available = False
+
+_tess_api = None
+
+def init_tesserocr_worker(tessdata_prefix: Optional[str]) -> None:
+    """Pool initializer: load the Tesseract engine once for the worker's lifetime."""
+    global _tess_api
+    if not tesserocr_available or _tess_api is not None:
+        return
+    if tessdata_prefix:
+        _tess_api = tesserocr.PyTessBaseAPI(path=tessdata_prefix, lang='eng')
+    else:
+        _tess_api = tesserocr.PyTessBaseAPI(lang='eng')
+
+def tesserocr_ocr_page(image: np.ndarray) -> Tuple[np.ndarray, str]:
+    """
+    Preprocess a single page image and OCR it with the worker's Tesseract engine.
+    
+    Args:
+        image: Page image as a numpy array
+    
+    Returns:
+        Tuple of (preprocessed image, extracted text)
+    """
+    # Outside a pool the engine is loaded on first use
+    if _tess_api is None:
+        init_tesserocr_worker(os.getenv("TESSDATA_PREFIX"))
+    processed_img = preprocess_image(image)
+    _tess_api.SetImage(PIL.Image.fromarray(processed_img))
+    return processed_img, _tess_api.GetUTF8Text()
+
+def preprocess_image(image: np.ndarray) -> np.ndarray:
+    """
+    Preprocess an image to improve OCR quality.
+    
+    Args:
+        image: Input image as a numpy array
+        
+    Returns:
+        Processed image as a numpy array
+    """
+    # Convert to grayscale if it's not already
+    if len(image.shape) == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image
+    
+    # Apply threshold to get black and white image
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    
+    # Denoise image
+    try:
+        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
+    except Exception as e:
+        logger.warning(f"Denoising failed, using original binary image: {e}")
+        denoised = binary
+    
+    # Detect and correct skew if necessary
+    try:
+        coords = np.column_stack(np.where(denoised > 0))
+        angle = cv2.minAreaRect(coords)[-1]
+        
+        if angle < -45:
+            angle = -(90 + angle)
+        else:
+            angle = -angle
+            
+        # Only correct if skew is significant
+        if abs(angle) > 0.5:
+            (h, w) = denoised.shape[:2]
+            center = (w // 2, h // 2)
+            M = cv2.getRotationMatrix2D(center, angle, 1.0)
+            denoised = cv2.warpAffine(denoised, M, (w, h), 
+                                     flags=cv2.INTER_CUBIC, 
+                                     borderMode=cv2.BORDER_REPLICATE)
+    except Exception as e:
+        logger.warning(f"Skew correction failed: {e}")
+    
+    return denoised
@@ -1,34 +1,59 @@
 #preprocessing_v2.py
 import json
 import os
+import asyncio
 import logging
+import threading
+import contextlib
+import functools
+import itertools
+import multiprocessing
+import weakref
 from pathlib import Path
+from collections import OrderedDict
 import shutil
+import glob
 import zipfile
 import base64
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from PIL import Image
 import io
-import nbformat
+import mmap
 import re
 import tempfile
 # Removing problematic imports
 # from unstructured.partition.pdf import partition_pdf
 # from unstructured.documents.elements import NarrativeText, Image as UnstructuredImage
-import google.generativeai as genai
 from prompts.answer_key_prompt import get_answer_key_prompt
 from prompts.image_prompt import get_image_description_prompt
-from docx import Document
-import docx2txt
 import uuid
 import hashlib
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # Better PDF extraction libraries
 import pypdf
 import fitz  # PyMuPDF
 
+try:
+    import pypdfium2 as pdfium
+    pdfium_available = True
+except ImportError:
+    pdfium_available = False
+
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
+try:
+    from charset_normalizer import from_bytes as detect_charset
+    charset_normalizer_available = True
+except ImportError:
+    charset_normalizer_available = False
+
 # Import Neo4j connector
 try:
     from utils.neo4j_connector import Neo4jConnector
@@ -54,6 +79,134 @@ logger = logging.getLogger(__name__)
 os.environ["EXTRACT_IMAGE_BLOCK_CROP_HORIZONTAL_PAD"] = "20"
 os.environ["EXTRACT_IMAGE_BLOCK_CROP_VERTICAL_PAD"] = "20"
 
+# Patterns used by FilePreprocessor._clean_pdf_text
+_RE_PAGE_OF = re.compile(r'\bPage\s+\d+\s+of\s+\d+\b')
+_RE_PAGE_N = re.compile(r'\bPage\s+\d+\b')
+_RE_PAGE_BREAK = re.compile(r'\n\n(?=Page \d+:)')
+# Runs after whitespace is collapsed, so at most one space can follow the hyphen
+_RE_HYPHEN = re.compile(r'(?<=[a-z])- ?(?=[a-z])')
+_RE_HF = re.compile(r'(?i)(header|footer):\s*.*?\n')
+
+# Bump when extraction output changes, so stale on-disk cache entries are ignored
+_EXTRACTION_CACHE_VERSION = 3
+
+# On-disk extraction cache size; least recently used entries are removed beyond it
+_EXTRACTION_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Cache writes between size checks of the on-disk extraction cache
+_EXTRACTION_CACHE_PRUNE_INTERVAL = 32
+
+# Texts kept in memory by FilePreprocessor.extract_text_from_file
+_TEXT_MEMO_SIZE = 128
+
+# PDFs larger than this are read by pypdf through a memory map
+_PDF_MMAP_THRESHOLD = 50 * 1024 * 1024
+
+# A PDF of more than two pages with fewer text characters than this is treated as a scan
+_SCANNED_PDF_MAX_CHARS = 50
+
+# Submission file types FilePreprocessor can extract text from
+_SUBMISSION_EXTENSIONS = ('.pdf', '.txt', '.docx', '.ipynb')
+
+# Characters replaced with "_" when a student name becomes a filename
+_RE_SAFE = re.compile(r'\W')
+
+# Characters replaced with "_" in the name part of a student identifier: a
+# translation table for ASCII names and a regex for everything else
+_STUDENT_NAME_TABLE = str.maketrans({
+    chr(i): chr(i) if chr(i).isalnum() or chr(i) in '_- ' else '_' for i in range(128)
+})
+_RE_STUDENT_NAME = re.compile(r'[^\w\- ]')
+
+# Images described per Gemini request, and the marker separating their descriptions
+_IMAGE_BATCH_SIZE = 8
+_IMAGE_BATCH_DELIMITER = "=== IMAGE BREAK ==="
+
+# Maximum number of Gemini requests in flight at once
+_GEMINI_MAX_CONCURRENCY = 8
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion from sync code, even if this thread already runs an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside a running loop (e.g. a FastAPI handler): use a fresh loop in a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+# DOCX body element tags and the hyperlink lookup used by FilePreprocessor._process_docx
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P = f'{_W_NS}p'
+_W_TBL = f'{_W_NS}tbl'
+_W_HYPERLINK_PATH = f'.//{_W_NS}hyperlink'
+
+# Heavy libraries are imported on first use, so worker processes that only
+# handle PDFs never pay for Gemini, DOCX or notebook support
+@functools.lru_cache(maxsize=None)
+def _lazy_genai():
+    import google.generativeai as genai
+    return genai
+
+@functools.lru_cache(maxsize=None)
+def _lazy_nbformat():
+    import nbformat
+    return nbformat
+
+@functools.lru_cache(maxsize=None)
+def _lazy_docx():
+    from docx import Document
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+    return Document, Paragraph, Table
+
+# Block size used when streaming a file through the fingerprint hash
+_FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+def _file_fingerprint(file_path: str) -> str:
+    """
+    Compute a content fingerprint for a file, used as an extraction cache key.
+    
+    The whole file is hashed, streamed in blocks rather than read into memory,
+    so two submissions only share a cache entry when their bytes are identical.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        Hex digest of the file content
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_FINGERPRINT_BLOCK_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def _extract_text_with_pdfium(pdf_path: str) -> str:
+    """
+    Extract page-labelled text from a PDF with PDFium's range-based text extractor.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        
+    Returns:
+        Extracted text, one "Page N:" block per page
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        page_texts = []
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                page_texts.append(f"Page {i+1}:\n{textpage.get_text_range()}\n\n")
+            finally:
+                textpage.close()
+                page.close()
+        return "".join(page_texts)
+    finally:
+        pdf.close()
+
 def extract_text_from_pdf(pdf_path: str) -> str:
     """
     Extract text from a PDF file using the best available method.
@@ -67,66 +220,111 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     """
     logger.info(f"Extracting text from PDF: {pdf_path}")
     
-    # Try PyPDF2 first
-    try:
-        with open(pdf_path, 'rb') as f:
-            reader = pypdf.PdfReader(f)
-            text = ""
-            
-            # Extract text from each page
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"Page {i+1}:\n{page_text}\n\n"
-            
-            # If we got good text content, return it
-            if len(text.strip()) > 100:  # Arbitrary length to check if extraction was successful
-                logger.info(f"Successfully extracted text with PyPDF2: {len(text)} characters")
+    # Try pypdfium2 first (PDFium's range-based extractor is the fastest available)
+    if pdfium_available:
+        try:
+            text = _extract_text_with_pdfium(pdf_path)
+            if len(text.strip()) > 100:
+                logger.info(f"Successfully extracted text with pypdfium2: {len(text)} characters")
                 return text
-    except Exception as e:
-        logger.warning(f"PyPDF2 extraction failed: {e}")
+        except Exception as e:
+            logger.warning(f"pypdfium2 extraction failed: {e}")
     
-    # Fall back to PyMuPDF if available
+    # Fall back to PyMuPDF (C engine, much faster than pypdf)
     try:
-        import fitz  # PyMuPDF
-        text = ""
-        doc = fitz.open(pdf_path)
-        
-        # Process each page
-        for page_num, page in enumerate(doc):
-            # Extract text
-            page_text = page.get_text()
-            text += f"Page {page_num+1}:\n{page_text}\n\n"
+        with fitz.open(pdf_path) as doc:
+            page_texts = [
+                f"Page {page_num+1}:\n{page.get_text('text')}\n\n"
+                for page_num, page in enumerate(doc)
+            ]
+        text = "".join(page_texts)
         
         # Check if we got sufficient text
-        if len(text.strip()) > 100:
+        if len(text.strip()) > 100:  # Arbitrary length to check if extraction was successful
             logger.info(f"Successfully extracted text with PyMuPDF: {len(text)} characters")
             return text
-            
-    except ImportError:
-        logger.warning("PyMuPDF not available")
     except Exception as e:
         logger.warning(f"PyMuPDF extraction failed: {e}")
     
-    # Last resort: Just use a simple extraction method
+    # Fall back to pypdf
     try:
         with open(pdf_path, 'rb') as f:
             reader = pypdf.PdfReader(f)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n\n"
-        logger.info(f"Used simple PDF extraction method as fallback: {len(text)} characters")
+            page_texts = []
+            
+            # Extract text from each page
+            for i, page in enumerate(reader.pages):
+                page_text = page.extract_text()
+                if page_text:
+                    page_texts.append(f"Page {i+1}:\n{page_text}\n\n")
+            text = "".join(page_texts)
+        
+        logger.info(f"Extracted text with PyPDF2 as fallback: {len(text)} characters")
         return text
     except Exception as e:
         logger.error(f"All PDF extraction methods failed: {e}")
         return f"Error extracting text from PDF: {str(e)}"
 
+
+def _read_text_file(file_path) -> str:
+    """
+    Read a text file with a single read, decoding it as UTF-8 when possible.
+    
+    Args:
+        file_path: Path to the text file
+        
+    Returns:
+        Decoded file content
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        # Not UTF-8: detect the encoding from the bytes already in memory
+        best = detect_charset(data).best() if charset_normalizer_available else None
+        text = str(best) if best is not None else data.decode('latin-1')
+    
+    # Match the newline translation of reading in text mode
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _write_bytes_atomic(path: Path, data: bytes) -> None:
+    """
+    Write a file via a temporary sibling and os.replace, so readers never see partial content.
+    
+    Args:
+        path: Destination file path
+        data: File content
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        with open(tmp_path, 'wb', buffering=1 << 20) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _json_bytes(data: Any) -> bytes:
+    """Serialize data as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson_available:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
 class FilePreprocessor:
     def __init__(self, temp_dir: str = "temp_uploads", output_dir: str = "processed_uploads", 
-                 custom_output_path: str = None, save_ocr_files: bool = True):
+                 custom_output_path: str = None, save_ocr_files: bool = True, connect_db: bool = True,
+                 cache_dir: str = None):
         self.directories = ensure_directory_structure()
         self.temp_dir = self.directories["temp_uploads"]
         self.extracted_dir = self.temp_dir / "extracted"
+        self._sweep_deleting_dirs()
         
         # Allow custom output directory if specified
         if custom_output_path:
@@ -139,12 +337,28 @@ class FilePreprocessor:
         self.logger = logger
         self.save_ocr_files = save_ocr_files
         
+        # Extracted text keyed by file content, shared across jobs and output directories
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".cache" / "scorepal" / "ocr"
+        self._cache_writes = itertools.count()
+        
+        # Recently extracted texts keyed by (path, mtime, size)
+        self._text_memo = OrderedDict()
+        self._text_memo_lock = threading.Lock()
+        
+        # Gemini models are created on first use and reused across calls
+        self._gemini_model = None
+        self._gemini_async_models = weakref.WeakKeyDictionary()
+        
         # Initialize Neo4j connector if available
         self.db = None
-        if neo4j_available:
+        if neo4j_available and connect_db:
             self.db = Neo4jConnector()
         
-        self._setup_directories()
+        # Numbers the students of the archive being extracted
+        self._student_counter = itertools.count(1)
+        
+        # Output directory known to exist, so repeat jobs can skip creating it
+        self._last_output_dir = self.output_dir
         
     def _generate_assignment_id(self, assignment_name: str, question_text: str) -> str:
         """Generate a unique ID for an assignment based on its content."""
@@ -177,7 +391,9 @@ class FilePreprocessor:
         # Set output path if provided
         if custom_output_path:
             self.output_dir = Path(custom_output_path)
-            os.makedirs(self.output_dir, exist_ok=True)
+            if self.output_dir != self._last_output_dir:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self._last_output_dir = self.output_dir
             logger.info(f"Using custom output directory for this job: {self.output_dir}")
             
         # Set whether to save OCR files
@@ -266,9 +482,10 @@ class FilePreprocessor:
             rubric: Rubric for grading
             submissions: Dictionary mapping student names to submission texts
         """
-        # Create a directory for this assignment
+        # Create the assignment directory and its submissions folder in one call
         assignment_dir = self.output_dir / assignment_id
-        os.makedirs(assignment_dir, exist_ok=True)
+        submissions_dir = assignment_dir / "submissions"
+        submissions_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Saving processed data to: {assignment_dir}")
         
         # Save assignment metadata
@@ -282,39 +499,31 @@ class FilePreprocessor:
             "saved_location": str(assignment_dir)
         }
         
-        with open(assignment_dir / "metadata.json", 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        (assignment_dir / "metadata.json").write_bytes(_json_bytes(metadata))
         logger.info(f"Saved metadata to {assignment_dir}/metadata.json")
         
         # Save question text
-        with open(assignment_dir / "question.txt", 'w', encoding='utf-8') as f:
-            f.write(question_text)
+        (assignment_dir / "question.txt").write_bytes(question_text.encode('utf-8'))
         logger.info(f"Saved question text to {assignment_dir}/question.txt")
         
         # Save answer key if available
         if answer_key:
-            with open(assignment_dir / "answer_key.txt", 'w', encoding='utf-8') as f:
-                f.write(answer_key)
+            (assignment_dir / "answer_key.txt").write_bytes(answer_key.encode('utf-8'))
             logger.info(f"Saved answer key to {assignment_dir}/answer_key.txt")
         
         # Save rubric if available
         if rubric:
-            with open(assignment_dir / "rubric.json", 'w', encoding='utf-8') as f:
-                json.dump(rubric, f, indent=2)
+            (assignment_dir / "rubric.json").write_bytes(_json_bytes(rubric))
             logger.info(f"Saved rubric to {assignment_dir}/rubric.json")
         
         # Save submissions
-        submissions_dir = assignment_dir / "submissions"
-        os.makedirs(submissions_dir, exist_ok=True)
-        
         for student_name, submission_text in submissions.items():
             # Sanitize student name to create a safe filename
-            safe_name = "".join(c if c.isalnum() else "_" for c in student_name)
+            safe_name = _RE_SAFE.sub('_', student_name)
             submission_file = submissions_dir / f"{safe_name}.txt"
             
             try:
-                with open(submission_file, 'w', encoding='utf-8') as f:
-                    f.write(submission_text)
+                submission_file.write_bytes(submission_text.encode('utf-8'))
                 logger.info(f"Saved submission for {student_name} to {submission_file}")
             except Exception as e:
                 logger.error(f"Error saving submission for {student_name}: {e}")
@@ -322,16 +531,15 @@ class FilePreprocessor:
         logger.info(f"Successfully saved all processed data to {assignment_dir}")
         
         # Create a file indicating processing is complete
-        with open(assignment_dir / "processing_complete.txt", 'w') as f:
-            f.write(f"Processing completed at {datetime.now().isoformat()}")
+        (assignment_dir / "processing_complete.txt").write_text(
+            f"Processing completed at {datetime.now().isoformat()}", encoding='utf-8'
+        )
         
         return assignment_dir
 
     def _process_pdf(self, pdf_path: str) -> str:
         """
-        Process a PDF file using multiple methods to ensure the best text extraction.
-        This improved version uses PyPDF2 first, then falls back to enhanced OCR
-        extraction if needed for better accuracy.
+        Process a PDF file, reusing the cached text of an identical file when available.
         
         Args:
             pdf_path: Path to the PDF file
@@ -339,80 +547,210 @@ class FilePreprocessor:
         Returns:
             Extracted text from the PDF
         """
+        return self._process_pdf_with_method(pdf_path)[0]
+
+    def _process_pdf_with_method(self, pdf_path: str, cache: bool = True) -> Tuple[str, str]:
+        """
+        Process a PDF file and report which extraction method produced the text.
+        
+        Extracted text is cached under ``cache_dir`` keyed by a content
+        fingerprint, so re-uploaded or duplicate files skip extraction, OCR and
+        image description entirely.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            cache: Whether to read and populate the extraction cache
+            
+        Returns:
+            Tuple of (extracted text, method used). The method is one of
+            "pdfium", "pymupdf", "pypdf", "advanced_ocr", "fallback", "error",
+            or "cache" when the text came from the extraction cache.
+        """
+        cache_file = self._get_cache_file(pdf_path, '.pdf') if cache else None
+        if cache_file is not None:
+            cached = self._read_cache_file(cache_file)
+            if cached is not None:
+                logger.info(f"Using cached extraction for PDF: {pdf_path}")
+                return cached, "cache"
+        
+        text, method = self._extract_pdf(pdf_path)
+        
+        # Don't cache failures so they are retried next time
+        if cache_file is not None and method != "error":
+            self._write_cache_file(cache_file, text)
+        
+        return text, method
+
+    def _get_cache_file(self, file_path: str, file_extension: str) -> Optional[Path]:
+        """
+        Return the extraction cache entry for a file, or None if it can't be fingerprinted.
+        
+        Args:
+            file_path: Path to the source file
+            file_extension: Lower-cased extension of the source file
+            
+        Returns:
+            Path of the cache entry, which may not exist yet
+        """
+        try:
+            return self.cache_dir / f"{_file_fingerprint(file_path)}{file_extension}.v{_EXTRACTION_CACHE_VERSION}.txt"
+        except OSError as e:
+            logger.warning(f"Extraction cache lookup failed for {file_path}: {e}")
+            return None
+
+    def _read_cache_file(self, cache_file: Path) -> Optional[str]:
+        """Return the cached text, or None on a cache miss."""
+        try:
+            text = cache_file.read_bytes().decode('utf-8')
+            # Mark the entry as recently used so pruning keeps it
+            os.utime(cache_file)
+            return text
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Failed to read extraction cache {cache_file}: {e}")
+            return None
+
+    def _write_cache_file(self, cache_file: Path, text: str) -> None:
+        """Store extracted text in the cache, replacing the entry atomically."""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            _write_bytes_atomic(cache_file, text.encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Failed to cache extraction to {cache_file}: {e}")
+            return
+        
+        if next(self._cache_writes) % _EXTRACTION_CACHE_PRUNE_INTERVAL == 0:
+            self._prune_cache_dir()
+
+    def _prune_cache_dir(self) -> None:
+        """
+        Keep the extraction cache under _EXTRACTION_CACHE_MAX_BYTES.
+        
+        Entries are removed least recently used first; reads refresh an
+        entry's modification time, so it doubles as the last use.
+        """
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith('.txt'):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError as e:
+            logger.warning(f"Failed to scan extraction cache {self.cache_dir}: {e}")
+            return
+        
+        if total <= _EXTRACTION_CACHE_MAX_BYTES:
+            return
+        
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= _EXTRACTION_CACHE_MAX_BYTES:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove extraction cache entry {path}: {e}")
+                continue
+            total -= size
+            removed += 1
+        logger.info(f"Pruned {removed} entries from extraction cache {self.cache_dir}")
+
+    def _extract_pdf(self, pdf_path: str) -> Tuple[str, str]:
+        """
+        Extract text from a PDF file using multiple methods to ensure the best result.
+        pypdfium2 is tried first, then PyMuPDF, then pypdf, then the enhanced OCR
+        system if none of them produces enough text.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Tuple of (extracted text, name of the method that produced it)
+        """
         logger.info(f"Processing PDF: {pdf_path}")
         
         # Create a filename base for any saved outputs
         pdf_basename = os.path.basename(pdf_path)
         pdf_name_no_ext = os.path.splitext(pdf_basename)[0]
         
-        # Try PyPDF2 first
-        try:
-            with open(pdf_path, 'rb') as f:
-                reader = pypdf.PdfReader(f)
-                text = ""
-                
-                # Extract text from each page
-                for i, page in enumerate(reader.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += f"Page {i+1}:\n{page_text}\n\n"
-                
-                # If we got good text content, return it
-                if len(text.strip()) > 100:  # Arbitrary length to check if extraction was successful
-                    logger.info(f"Successfully extracted text with PyPDF2: {len(text)} characters")
+        # Short text from a parser, used if every method comes up short
+        fallback_text = None
+        
+        # Set when the PDF is a multi-page image scan with no text layer
+        scanned = False
+        
+        # Try pypdfium2 first (PDFium's range-based extractor is the fastest available)
+        if pdfium_available:
+            try:
+                text = _extract_text_with_pdfium(pdf_path)
+                if len(text.strip()) > 100:
+                    logger.info(f"Successfully extracted text with pypdfium2: {len(text)} characters")
                     
                     # Save the extracted text if requested
                     if self.save_ocr_files:
-                        self._save_extracted_text(text, f"{pdf_name_no_ext}_pypdf2.txt")
+                        self._save_extracted_text(text, f"{pdf_name_no_ext}_pdfium.txt")
                         
-                    return self._clean_pdf_text(text)
-        except Exception as e:
-            logger.warning(f"PyPDF2 extraction failed: {e}")
+                    return self._clean_pdf_text(text), "pdfium"
+                fallback_text = text
+            except Exception as e:
+                logger.warning(f"pypdfium2 extraction failed: {e}")
         
-        # Fall back to PyMuPDF (more powerful but sometimes has issues with certain PDFs)
+        # Fall back to PyMuPDF, which also describes images on text-poor pages
         try:
-            text = ""
-            doc = fitz.open(pdf_path)
-            
-            # Track images for later processing
-            image_paths = []
+            page_parts = []
+            # (page index, image bytes) pairs to describe in one batch after the page loop
+            pending_images = []
             
-            # Process each page
-            for page_num, page in enumerate(doc):
-                # Extract text
-                page_text = page.get_text()
-                text += f"Page {page_num+1}:\n{page_text}\n\n"
+            with fitz.open(pdf_path) as doc:
+                text_chars = 0
                 
-                # Extract images if text content is limited
-                if len(page_text.strip()) < 100:  # If page has little text, it might be image-heavy
-                    logger.info(f"Page {page_num+1} has limited text, extracting images")
-                    try:
-                        # Extract images from the page
-                        images = page.get_images(full=True)
-                        for img_index, img_info in enumerate(images):
-                            xref = img_info[0]  # Get the XREF of the image
-                            base_img = doc.extract_image(xref)
-                            image_bytes = base_img["image"]
-                            
-                            # Save image to a temporary file
-                            img_filename = f"{pdf_path}_page{page_num+1}_img{img_index}.png"
-                            with open(img_filename, "wb") as img_file:
-                                img_file.write(image_bytes)
-                            
-                            image_paths.append(img_filename)
-                    except Exception as img_e:
-                        logger.warning(f"Image extraction failed on page {page_num+1}: {img_e}")
+                # Process each page
+                for page_num, page in enumerate(doc):
+                    # Extract text
+                    page_text = page.get_text("text")
+                    page_parts.append(f"Page {page_num+1}:\n{page_text}\n\n")
+                    page_chars = len(page_text.strip())
+                    text_chars += page_chars
+                    
+                    # Collect images if text content is limited
+                    if page_chars < 100:  # If page has little text, it might be image-heavy
+                        logger.info(f"Page {page_num+1} has limited text, extracting images")
+                        try:
+                            # Keep image bytes in memory for the batched description request
+                            images = page.get_images(full=False)
+                            for img_index, img_info in enumerate(images):
+                                xref = img_info[0]  # Get the XREF of the image
+                                try:
+                                    base_img = doc.extract_image(xref)
+                                    pending_images.append((page_num, base_img["image"]))
+                                except Exception as img_e:
+                                    logger.warning(f"Failed to extract image {img_index} on page {page_num+1}: {img_e}")
+                        except Exception as img_e:
+                            logger.warning(f"Image extraction failed on page {page_num+1}: {img_e}")
             
-            # Process extracted images with Gemini
-            for img_path in image_paths:
-                try:
-                    image_desc = self._process_image(img_path)
+            # Describe all collected images with as few Gemini requests as possible
+            if pending_images:
+                descriptions = self._process_images_batch([image for _, image in pending_images])
+                for (page_num, _), image_desc in zip(pending_images, descriptions):
                     if image_desc:
-                        text += f"\n[Image Description: {image_desc}]\n"
-                    # Clean up the temporary image file
-                    os.remove(img_path)
-                except Exception as img_e:
-                    logger.warning(f"Failed to process image {img_path}: {img_e}")
+                        page_parts[page_num] += f"\n[Image Description: {image_desc}]\n"
+            
+            text = "".join(page_parts)
+            
+            # A multi-page document with essentially no text layer is a scan, and
+            # another text parser won't find anything PyMuPDF didn't
+            scanned = len(page_parts) > 2 and text_chars < _SCANNED_PDF_MAX_CHARS
             
             # Check if we got sufficient text
             if len(text.strip()) > 100:
@@ -422,11 +760,47 @@ class FilePreprocessor:
                 if self.save_ocr_files:
                     self._save_extracted_text(text, f"{pdf_name_no_ext}_pymupdf.txt")
                     
-                return self._clean_pdf_text(text)
+                return self._clean_pdf_text(text), "pymupdf"
+            if fallback_text is None or len(text.strip()) > len(fallback_text.strip()):
+                fallback_text = text
             
         except Exception as e:
             logger.warning(f"PyMuPDF extraction failed: {e}")
         
+        # Fall back to pypdf, unless the PDF is a scan that only OCR can read
+        if scanned:
+            logger.info(f"{pdf_basename} looks like a scanned PDF, skipping pypdf and going straight to OCR")
+        else:
+            try:
+                with open(pdf_path, 'rb') as f, contextlib.ExitStack() as stack:
+                    # pypdf tokenizes with many tiny reads and seeks; on large files serve them
+                    # straight from the page cache instead of through a read buffer
+                    stream = f
+                    if os.fstat(f.fileno()).st_size > _PDF_MMAP_THRESHOLD:
+                        stream = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                    reader = pypdf.PdfReader(stream)
+                    text = ""
+                    
+                    # Extract text from each page
+                    for i, page in enumerate(reader.pages):
+                        page_text = page.extract_text()
+                        if page_text:
+                            text += f"Page {i+1}:\n{page_text}\n\n"
+                    
+                    # If we got good text content, return it
+                    if len(text.strip()) > 100:  # Arbitrary length to check if extraction was successful
+                        logger.info(f"Successfully extracted text with PyPDF2: {len(text)} characters")
+                        
+                        # Save the extracted text if requested
+                        if self.save_ocr_files:
+                            self._save_extracted_text(text, f"{pdf_name_no_ext}_pypdf2.txt")
+                            
+                        return self._clean_pdf_text(text), "pypdf"
+                    if fallback_text is None or len(text.strip()) > len(fallback_text.strip()):
+                        fallback_text = text
+            except Exception as e:
+                logger.warning(f"PyPDF2 extraction failed: {e}")
+            
         # Try the enhanced OCR system as a fallback
         try:
             from extraction_service_v2 import extract_pdf_text
@@ -439,58 +813,52 @@ class FilePreprocessor:
                 if self.save_ocr_files:
                     self._save_extracted_text(ocr_text, f"{pdf_name_no_ext}_advanced_ocr.txt")
                     
-                return self._clean_pdf_text(ocr_text)
+                return self._clean_pdf_text(ocr_text), "advanced_ocr"
         except Exception as e:
             logger.warning(f"Advanced OCR extraction failed: {e}")
         
-        # Last resort: Just use a simple extraction method
-        try:
-            with open(pdf_path, 'rb') as f:
-                reader = pypdf.PdfReader(f)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n\n"
-            logger.info(f"Used simple PDF extraction method as fallback: {len(text)} characters")
+        # Last resort: Use whatever the parsers managed to extract
+        if fallback_text is not None:
+            logger.info(f"Used simple PDF extraction method as fallback: {len(fallback_text)} characters")
             
             # Save the fallback text if requested
             if self.save_ocr_files:
-                self._save_extracted_text(text, f"{pdf_name_no_ext}_fallback.txt")
+                self._save_extracted_text(fallback_text, f"{pdf_name_no_ext}_fallback.txt")
                 
-            return self._clean_pdf_text(text)
-        except Exception as e:
-            logger.error(f"All PDF extraction methods failed: {e}")
-            return f"Error extracting text from PDF: {str(e)}"
+            return self._clean_pdf_text(fallback_text), "fallback"
+        
+        logger.error(f"All PDF extraction methods failed for {pdf_path}")
+        return "Error extracting text from PDF: all extraction methods failed", "error"
     
     def _clean_pdf_text(self, text: str) -> str:
         """Clean extracted PDF text by removing headers, footers, and fixing formatting issues."""
+        # Clean page by page to keep each intermediate string small
+        pages = map(self._clean_pdf_page, _RE_PAGE_BREAK.split(text))
+        return '\n\n'.join(page for page in pages if page)
+
+    def _clean_pdf_page(self, text: str) -> str:
+        """Clean the text of a single "Page N:" block."""
         # Remove page numbers
-        text = re.sub(r'\bPage\s+\d+\s+of\s+\d+\b', '', text)
-        text = re.sub(r'\bPage\s+\d+\b', '', text)
+        text = _RE_PAGE_OF.sub('', text)
+        text = _RE_PAGE_N.sub('', text)
         
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = ' '.join(text.split())
         
         # Fix common OCR/PDF extraction issues
-        text = re.sub(r'([a-z])-\s*([a-z])', r'\1\2', text)  # Fix hyphenated words
+        if '-' in text:
+            text = _RE_HYPHEN.sub('', text)  # Fix hyphenated words
         
         # Remove headers/footers (common patterns)
-        text = re.sub(r'(?i)(header|footer):\s*.*?\n', '', text)
+        text = _RE_HF.sub('', text)
         
-        # Clean up paragraphs
-        paragraphs = text.split('\n')
-        clean_paragraphs = []
-        
-        for para in paragraphs:
-            if len(para.strip()) > 0:
-                clean_paragraphs.append(para.strip())
-        
-        return '\n\n'.join(clean_paragraphs)
+        return text.strip()
 
     def _process_notebook(self, notebook_path: str) -> str:
         """Process Jupyter notebook files"""
         try:
             with open(notebook_path, 'r', encoding='utf-8') as f:
-                nb = nbformat.read(f, as_version=4)
+                nb = _lazy_nbformat().read(f, as_version=4)
                 
             # Extract text content from code and markdown cells
             content = []
@@ -505,6 +873,25 @@ class FilePreprocessor:
             logger.error(f"Error processing notebook {notebook_path}: {e}")
             return ""
         
+    def _get_gemini(self):
+        """Return the shared Gemini model, creating it on first use."""
+        if self._gemini_model is None:
+            self._gemini_model = _lazy_genai().GenerativeModel('gemini-2.0-flash')
+        return self._gemini_model
+
+    def _get_gemini_async(self):
+        """
+        Return the Gemini model for async calls on the running event loop.
+        
+        The SDK binds its async client to the loop that first uses it, and each
+        _run_coroutine call runs on a fresh loop, so models are cached per loop.
+        """
+        loop = asyncio.get_running_loop()
+        model = self._gemini_async_models.get(loop)
+        if model is None:
+            model = self._gemini_async_models[loop] = _lazy_genai().GenerativeModel('gemini-2.0-flash')
+        return model
+
     def _process_image(self, image_path: str) -> str:
         """
         Process an image using Gemini model to get a description.
@@ -512,35 +899,123 @@ class FilePreprocessor:
         Args:
             image_path: Path to the image file
             
+        Returns:
+            Text description of the image
+        """
+        with open(image_path, 'rb') as img_file:
+            if os.fstat(img_file.fileno()).st_size == 0:
+                return self._process_image_bytes(b"")
+            # Map the file instead of copying it into memory before base64 encoding
+            with mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return self._process_image_bytes(mm)
+
+    def _process_image_bytes(self, image_bytes: bytes) -> str:
+        """
+        Process in-memory image data using Gemini model to get a description.
+        
+        Args:
+            image_bytes: Raw encoded image data (PNG, JPEG, ...), as bytes or any buffer
+            
         Returns:
             Text description of the image
         """
         try:
-            with open(image_path, 'rb') as img_file:
-                img_data = base64.b64encode(img_file.read()).decode()
+            img_data = base64.b64encode(image_bytes).decode()
             
-            model = genai.GenerativeModel('gemini-2.0-flash')
+            model = self._get_gemini()
             prompt = get_image_description_prompt()
             response = model.generate_content([prompt, img_data])
             logger.info(f"Image processed with Gemini: {len(response.text)} characters")
             return response.text.strip()
         except Exception as e:
             logger.error(f"Image processing failed with Gemini: {e}")
+            return self._describe_image_basic(image_bytes)
+
+    async def _process_image_bytes_async(self, image_bytes: bytes) -> str:
+        """Async variant of _process_image_bytes using Gemini's async client."""
+        try:
+            img_data = base64.b64encode(image_bytes).decode()
+            
+            model = self._get_gemini_async()
+            prompt = get_image_description_prompt()
+            response = await model.generate_content_async([prompt, img_data])
+            logger.info(f"Image processed with Gemini: {len(response.text)} characters")
+            return response.text.strip()
+        except Exception as e:
+            logger.error(f"Image processing failed with Gemini: {e}")
+            return self._describe_image_basic(image_bytes)
+
+    def _describe_image_basic(self, image_bytes: bytes) -> str:
+        """Fallback description with basic image info when Gemini is unavailable."""
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                width, height = img.size
+                format_name = img.format
+                mode = img.mode
+                return f"Image: {width}x{height} {format_name} {mode}"
+        except Exception as img_e:
+            logger.error(f"Failed to get basic image info: {img_e}")
+            return "Image content (could not be processed)"
+
+    def _process_images_batch(self, images: List[bytes]) -> List[str]:
+        """
+        Describe several images, sending one Gemini request per batch of images.
+        
+        Batches are sent concurrently (at most _GEMINI_MAX_CONCURRENCY at a time).
+        
+        Args:
+            images: Raw encoded image data for each image
+            
+        Returns:
+            One description per input image, in the same order
+        """
+        batches = [images[start:start + _IMAGE_BATCH_SIZE] for start in range(0, len(images), _IMAGE_BATCH_SIZE)]
+        batch_descriptions = _run_coroutine(self._describe_batches_async(batches))
+        return [description for descriptions in batch_descriptions for description in descriptions]
+
+    async def _describe_batches_async(self, batches: List[List[bytes]]) -> List[List[str]]:
+        """Describe all image batches concurrently, capped to stay under Gemini rate limits."""
+        semaphore = asyncio.Semaphore(_GEMINI_MAX_CONCURRENCY)
+        return await asyncio.gather(*(self._describe_batch_async(batch, semaphore) for batch in batches))
+
+    async def _describe_batch_async(self, batch: List[bytes], semaphore: asyncio.Semaphore) -> List[str]:
+        """
+        Describe one batch of images with a single Gemini request.
+        
+        Falls back to describing images one by one when the response can't be
+        split into exactly one description per image.
+        """
+        async with semaphore:
+            if len(batch) == 1:
+                return [await self._process_image_bytes_async(batch[0])]
             
-            # Fallback to basic image info
             try:
-                with Image.open(image_path) as img:
-                    width, height = img.size
-                    format_name = img.format
-                    mode = img.mode
-                    return f"Image: {width}x{height} {format_name} {mode}"
-            except Exception as img_e:
-                logger.error(f"Failed to get basic image info: {img_e}")
-                return "Image content (could not be processed)"
+                contents = [
+                    get_image_description_prompt()
+                    + f"\n\nYou will be given {len(batch)} images. Describe each one separately, "
+                    f"in order, and separate consecutive descriptions with a line containing only "
+                    f"{_IMAGE_BATCH_DELIMITER}."
+                ]
+                for i, image_bytes in enumerate(batch, 1):
+                    contents.append(f"Image {i}:")
+                    contents.append(base64.b64encode(image_bytes).decode())
+                
+                model = self._get_gemini_async()
+                response = await model.generate_content_async(contents)
+                parts = [part.strip() for part in response.text.split(_IMAGE_BATCH_DELIMITER)]
+                parts = [part for part in parts if part]
+                if len(parts) != len(batch):
+                    raise ValueError(f"expected {len(batch)} descriptions, got {len(parts)}")
+                
+                logger.info(f"Described {len(batch)} images with one Gemini request")
+                return parts
+            except Exception as e:
+                logger.warning(f"Batched image description failed, describing images individually: {e}")
+                return [await self._process_image_bytes_async(image_bytes) for image_bytes in batch]
 
     def _generate_answer_key(self, question_text: str, rubric: Dict[str, Any]) -> str:
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash')
+            model = self._get_gemini()
             prompt = get_answer_key_prompt(question_text, rubric)
             # print(f"Answer key prompt: {prompt}")
             response = model.generate_content(prompt)
@@ -553,32 +1028,30 @@ class FilePreprocessor:
     def _process_docx(self, docx_path: str) -> str:
         """Process DOCX files with text and hyperlink extraction"""
         try:
-            # Method 1: Using docx2txt for comprehensive extraction
-            text = docx2txt.process(docx_path)
-            
-            # Method 2: Alternative manual extraction with hyperlinks
+            Document, Paragraph, Table = _lazy_docx()
             doc = Document(docx_path)
             full_text = []
             
-            # Process paragraphs with hyperlinks
-            for para in doc.paragraphs:
-                # Check for hyperlinks in the paragraph
-                if para._element.xpath('.//w:hyperlink'):
-                    for hyperlink in para.hyperlinks:
-                        # Extract hyperlink text and URL
-                        link_text = ' '.join([run.text for run in hyperlink.runs])
-                        link_url = hyperlink.address
-                        full_text.append(f"{link_text} ({link_url})")
-                else:
-                    full_text.append(para.text)
-            
-            # Process tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        full_text.append(cell.text)
+            # Walk the body once, handling paragraphs and tables in document order
+            for child in doc.element.body.iterchildren():
+                if child.tag == _W_P:
+                    para = Paragraph(child, doc)
+                    # Check for hyperlinks in the paragraph
+                    if child.find(_W_HYPERLINK_PATH) is not None:
+                        for hyperlink in para.hyperlinks:
+                            # Extract hyperlink text and URL
+                            link_text = ' '.join([run.text for run in hyperlink.runs])
+                            link_url = hyperlink.address
+                            full_text.append(f"{link_text} ({link_url})")
+                    else:
+                        full_text.append(para.text)
+                elif child.tag == _W_TBL:
+                    # Process tables
+                    for row in Table(child, doc).rows:
+                        for cell in row.cells:
+                            full_text.append(cell.text)
             
-            return '\n\n'.join(full_text) if full_text else text
+            return '\n\n'.join(full_text)
             
         except Exception as e:
             logger.error(f"Error processing DOCX {docx_path}: {e}")
@@ -600,12 +1073,6 @@ class FilePreprocessor:
             logger.error(f"Error saving image metadata: {e}")
             return ""
 
-    def _setup_directories(self):
-        os.makedirs(self.temp_dir, exist_ok=True)
-        os.makedirs(self.extracted_dir, exist_ok=True)
-        os.makedirs(self.output_dir, exist_ok=True)
-        logger.info(f"Directories created: {self.temp_dir}, {self.extracted_dir}, {self.output_dir}")
-
     def _save_uploaded_file(self, uploaded_file, filename: str) -> Path:
         file_path = self.temp_dir / filename
         with open(file_path, 'wb') as f:
@@ -615,8 +1082,8 @@ class FilePreprocessor:
     def _extract_submissions(self, zip_path: Path) -> Dict[str, str]:
         """Extract student submissions from a ZIP file."""
         submissions = {}
-        processed_count = 0
-        failed_count = 0
+        # Only failures are named in the summary log after the loop
+        failed_names = []
         
         # Create a folder for extracted submission files if needed
         ocr_extracts_dir = self.output_dir / "extracted_ocr_files"
@@ -630,63 +1097,73 @@ class FilePreprocessor:
                 shutil.rmtree(extraction_path)
             extraction_path.mkdir(parents=True, exist_ok=True)
             
-            # Extract the ZIP file
+            # Count documents from the ZIP index, so the pool can be sized before unzipping
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extraction_path)
+                document_count = sum(
+                    1 for name in zip_ref.namelist()
+                    if os.path.splitext(name)[1].lower() in _SUBMISSION_EXTENSIONS
+                )
             
-            # Process each file
-            for file_path in self._get_document_files(extraction_path):
-                try:
-                    # Get student name from filename
-                    file_name = file_path.name
-                    student_name = self._extract_student_name(file_path)
+            self._student_counter = itertools.count(1)
+            
+            # Extraction is CPU-bound (PDF parsing, OCR), so spread files across processes
+            if document_count > 2:
+                # Workers are spawned rather than forked because the unzip threads are still running
+                with ProcessPoolExecutor(
+                    max_workers=min(document_count, os.cpu_count() or 1),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_submission_worker,
+                    initargs=(str(self.output_dir), self.save_ocr_files, str(self.cache_dir),
+                              os.getenv("GEMINI_API_KEY"))
+                ) as executor:
+                    # Start on each document as soon as it is unzipped
+                    futures = {}
+                    for position, file_path in self._extract_zip(zip_path, extraction_path):
+                        if file_path.suffix.lower() in _SUBMISSION_EXTENSIONS:
+                            futures[executor.submit(_extract_one_submission, str(file_path))] = (position, file_path)
                     
-                    # Extract text from file
-                    file_extension = file_path.suffix.lower()
-                    submission_text = ""
+                    # Name students in archive order
+                    documents = sorted(futures.values())
+                    index_of = {position: index for index, (position, _) in enumerate(documents)}
+                    items = [(file_path, self._extract_student_name(file_path)) for _, file_path in documents]
                     
-                    if file_extension == '.pdf':
-                        submission_text = self._process_pdf(str(file_path))
-                        
-                        # If PDF extraction failed or returned very little text, try enhanced OCR
-                        if len(submission_text.strip()) < 100 or "Error extracting text from PDF" in submission_text:
-                            logger.warning(f"Initial PDF extraction produced limited text for {file_name}, trying advanced OCR...")
-                            try:
-                                from extraction_service_v2 import extract_pdf_text
-                                ocr_text = extract_pdf_text(str(file_path))
-                                if len(ocr_text.strip()) > 100:
-                                    logger.info(f"Advanced OCR extraction successful for {file_name}")
-                                    submission_text = ocr_text
-                                    
-                                    # Save the OCR text separately if requested
-                                    if self.save_ocr_files:
-                                        ocr_file_path = ocr_extracts_dir / f"{file_path.stem}_ocr.txt"
-                                        with open(ocr_file_path, 'w', encoding='utf-8') as f:
-                                            f.write(ocr_text)
-                                        logger.info(f"Saved OCR extract to {ocr_file_path}")
-                            except Exception as ocr_e:
-                                logger.error(f"Advanced OCR extraction also failed for {file_name}: {ocr_e}")
-                    elif file_extension == '.txt':
+                    # Collect in completion order so one slow OCR job doesn't hold up the rest
+                    results = [None] * len(items)
+                    for done, future in enumerate(as_completed(futures), 1):
+                        index = index_of[futures[future][0]]
                         try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                submission_text = f.read()
-                        except UnicodeDecodeError:
-                            # Try with different encodings
-                            try:
-                                with open(file_path, 'r', encoding='latin-1') as f:
-                                    submission_text = f.read()
-                            except Exception as e:
-                                logger.error(f"Failed to read text file with multiple encodings: {e}")
-                    elif file_extension == '.docx':
-                        submission_text = self._process_docx(str(file_path))
-                    elif file_extension == '.ipynb':
-                        submission_text = self._process_notebook(str(file_path))
-                    else:
-                        logger.warning(f"Unsupported file extension: {file_extension}")
-                        continue
-                    
+                            results[index] = future.result()
+                        except Exception as e:
+                            results[index] = e
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Extracted {done}/{len(items)} submissions")
+            else:
+                documents = sorted(
+                    (position, file_path)
+                    for position, file_path in self._extract_zip(zip_path, extraction_path)
+                    if file_path.suffix.lower() in _SUBMISSION_EXTENSIONS
+                )
+                items = [(file_path, self._extract_student_name(file_path)) for _, file_path in documents]
+                results = []
+                for file_path, _ in items:
+                    try:
+                        results.append(self._extract_submission_text(file_path))
+                    except Exception as e:
+                        results.append(e)
+            
+            # Per-student extracts, written together once every result is in
+            pending_writes = []
+            
+            # Assign identifiers in archive order so numbering is deterministic
+            for (file_path, student_name), submission_text in zip(items, results):
+                if isinstance(submission_text, Exception):
+                    logger.error(f"Error processing submission {file_path}: {submission_text}")
+                    failed_names.append(file_path.name)
+                    continue
+                
+                try:
                     # Add student identifier to the beginning of submission
-                    student_identifier = f"Student_{processed_count+1}_{student_name}"
+                    student_identifier = f"Student_{len(submissions)+1}_{student_name}"
                     
                     # Store submission with text
                     if submission_text and len(submission_text.strip()) > 0:
@@ -694,26 +1171,29 @@ class FilePreprocessor:
                         
                         # Save individual submission file if requested
                         if self.save_ocr_files:
-                            submission_file_path = ocr_extracts_dir / f"{student_identifier}.txt"
-                            with open(submission_file_path, 'w', encoding='utf-8') as f:
-                                f.write(submission_text)
-                            logger.info(f"Saved processed submission to {submission_file_path}")
-                            
-                        logger.info(f"Successfully processed submission for: {student_identifier}")
-                        processed_count += 1
+                            pending_writes.append((
+                                ocr_extracts_dir / f"{student_identifier}.txt",
+                                submission_text.encode('utf-8')
+                            ))
                     else:
-                        logger.warning(f"Empty submission for: {student_identifier}")
-                        failed_count += 1
+                        failed_names.append(file_path.name)
                         
                 except Exception as e:
                     logger.error(f"Error processing submission {file_path}: {e}")
-                    failed_count += 1
+                    failed_names.append(file_path.name)
             
-            logger.info(f"Processed {processed_count} submissions")
-            logger.info(f"Extracted {len(submissions)} submissions")
+            for submission_file_path, data in pending_writes:
+                try:
+                    _write_bytes_atomic(submission_file_path, data)
+                except OSError as e:
+                    logger.error(f"Error saving processed submission {submission_file_path}: {e}")
+            if pending_writes:
+                logger.info(f"Saved {len(pending_writes)} processed submissions to {ocr_extracts_dir}")
             
-            if failed_count > 0:
-                logger.warning(f"Failed to process {failed_count} submissions")
+            logger.info(f"Processed {len(submissions)} submissions, {len(failed_names)} failed")
+            
+            if failed_names:
+                logger.warning(f"Failed to process {len(failed_names)} submissions (errors or empty text): {failed_names}")
                 
             return submissions
         except zipfile.BadZipFile:
@@ -723,79 +1203,281 @@ class FilePreprocessor:
             logger.error(f"Error extracting submissions: {e}")
             return {}
 
+    def _extract_zip(self, zip_path: Path, extraction_path: Path) -> Iterator[Tuple[int, Path]]:
+        """
+        Extract a ZIP archive, decompressing its members in parallel threads.
+        
+        zlib releases the GIL while inflating, so members decompress concurrently.
+        ZipFile objects aren't safe for concurrent reads, so each worker thread
+        opens its own handle on the archive. Files are yielded as soon as they
+        are written, so callers can start on them while the rest is inflating.
+        
+        Args:
+            zip_path: Path to the ZIP file
+            extraction_path: Directory to extract into
+            
+        Yields:
+            (position in the archive, extracted file path), in completion order
+        """
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            members = zip_ref.infolist()
+        
+        root = os.path.realpath(extraction_path)
+        thread_state = threading.local()
+        open_archives = []
+        
+        def extract_member(member: zipfile.ZipInfo) -> Optional[Path]:
+            # Refuse entries that would land outside the extraction directory
+            target = os.path.realpath(os.path.join(root, member.filename))
+            if os.path.commonpath([root, target]) != root:
+                logger.warning(f"Skipping unsafe ZIP entry: {member.filename}")
+                return None
+            
+            if member.is_dir():
+                os.makedirs(target, exist_ok=True)
+                return None
+            
+            archive = getattr(thread_state, "archive", None)
+            if archive is None:
+                archive = thread_state.archive = zipfile.ZipFile(zip_path, 'r')
+                open_archives.append(archive)
+            
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with archive.open(member) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
+            return Path(target)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, len(members) or 1)) as executor:
+                futures = {executor.submit(extract_member, member): position for position, member in enumerate(members)}
+                for future in as_completed(futures):
+                    target = future.result()
+                    if target is not None:
+                        yield futures[future], target
+        finally:
+            for archive in open_archives:
+                archive.close()
+
+    def _extract_submission_text(self, file_path: Path) -> str:
+        """
+        Extract the text of a single submission file.
+        
+        Args:
+            file_path: Path to the submission file
+            
+        Returns:
+            Extracted submission text
+        """
+        file_name = file_path.name
+        file_extension = file_path.suffix.lower()
+        submission_text = ""
+        
+        if file_extension == '.pdf':
+            # Short results already went through advanced OCR inside _extract_pdf,
+            # so there is nothing left to retry here
+            submission_text, method = self._process_pdf_with_method(str(file_path))
+            if method in ("fallback", "error"):
+                logger.warning(f"PDF extraction produced limited text for {file_name} (method: {method})")
+        elif file_extension == '.txt':
+            try:
+                submission_text = _read_text_file(file_path)
+            except Exception as e:
+                logger.error(f"Failed to read text file {file_path}: {e}")
+        elif file_extension in ('.docx', '.ipynb'):
+            submission_text = self.extract_text_from_file(str(file_path))
+        
+        return submission_text
+
     def _extract_student_name(self, file_path: Path) -> str:
         """Extract student name from filename."""
         # Get base filename without extension
         name_base = file_path.stem
         
         # Clean it up (remove non-alphanumeric characters)
-        name_base = ''.join(c if c.isalnum() or c in ['_', '-', ' '] else '_' for c in name_base)
+        if name_base.isascii():
+            name_base = name_base.translate(_STUDENT_NAME_TABLE)
+        else:
+            name_base = _RE_STUDENT_NAME.sub('_', name_base)
         
         # Format as Student_X
-        student_number = len(os.listdir(self.extracted_dir))
+        student_number = next(self._student_counter)
         return f"Student_{student_number}_{name_base[:15]}"
 
     def _get_document_files(self, directory: Path) -> List[Path]:
         """Get all document files in a directory."""
-        document_extensions = ['.pdf', '.txt', '.docx', '.ipynb']
         document_files = []
         
-        for file_path in directory.glob('**/*'):
-            if file_path.is_file() and file_path.suffix.lower() in document_extensions:
-                document_files.append(file_path)
+        # Walk with scandir so file/dir checks use the cached directory entry type
+        stack = [str(directory)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(_SUBMISSION_EXTENSIONS) and entry.is_file():
+                        document_files.append(Path(entry.path))
         
         return document_files
 
-    def cleanup(self):
-        """Clean up temporary files."""
+    def cleanup(self, background: bool = True):
+        """
+        Clean up temporary files.
+        
+        The extracted submissions live inside the temp directory, so removing it
+        covers both. In background mode the directory is first renamed out of
+        the way, which is immediate, and then deleted by a daemon thread, so
+        callers don't wait on per-file unlinks and new uploads can reuse the path.
+        
+        Args:
+            background: Whether to delete the files on a background thread
+        """
         try:
-            if self.temp_dir.exists():
-                shutil.rmtree(self.temp_dir)
-            if self.extracted_dir.exists():
-                shutil.rmtree(self.extracted_dir)
+            target = self.temp_dir
+            if background:
+                target = self.temp_dir.with_name(f"{self.temp_dir.name}.deleting-{uuid.uuid4().hex}")
+                os.rename(self.temp_dir, target)
+                threading.Thread(
+                    target=shutil.rmtree, args=(target,), kwargs={'ignore_errors': True}, daemon=True
+                ).start()
+            else:
+                shutil.rmtree(target)
             logger.info("Temporary files cleaned up")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"Error cleaning up: {e}")
 
+    def _sweep_deleting_dirs(self) -> None:
+        """
+        Remove temp directories left behind by background cleanups.
+        
+        cleanup(background=True) renames the temp directory to a
+        ``*.deleting-<id>`` sibling before deleting it on a daemon thread; if the
+        process exits first, the renamed directory stays on disk. Any such
+        leftovers are deleted here on a daemon thread.
+        """
+        leftovers = list(self.temp_dir.parent.glob(f"{glob.escape(self.temp_dir.name)}.deleting-*"))
+        if not leftovers:
+            return
+        
+        def remove_leftovers():
+            for path in leftovers:
+                shutil.rmtree(path, ignore_errors=True)
+        
+        threading.Thread(target=remove_leftovers, daemon=True).start()
+
     def _save_extracted_text(self, text: str, filename: str) -> None:
         """Save extracted text to a file."""
         try:
-            with open(self.output_dir / filename, 'w') as f:
-                f.write(text)
+            _write_bytes_atomic(self.output_dir / filename, text.encode('utf-8'))
             logger.info(f"Saved extracted text to {self.output_dir / filename}")
         except Exception as e:
             logger.error(f"Error saving extracted text: {e}")
 
-    def extract_text_from_file(self, file_path: str) -> str:
-        """Extract text from a file based on its extension."""
-        if not os.path.exists(file_path):
+    def extract_text_from_file(self, file_path: str, cache: bool = True) -> str:
+        """
+        Extract text from a file based on its extension.
+        
+        Results are memoized in memory by (path, mtime, size), so a file that is
+        extracted repeatedly, such as an answer key shared by every student, is
+        only parsed once while it is unchanged. PDF, DOCX and notebook results
+        are also cached on disk by file content, so unchanged files are read
+        back from ``cache_dir`` instead of being parsed again.
+        
+        Args:
+            file_path: Path to the file
+            cache: Whether to use and populate the in-memory and on-disk caches
+            
+        Returns:
+            Extracted text, or an empty string on failure
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
             logger.error(f"File does not exist: {file_path}")
             return ""
-            
+        
+        key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        if cache:
+            with self._text_memo_lock:
+                text = self._text_memo.get(key)
+                if text is not None:
+                    self._text_memo.move_to_end(key)
+                    return text
+        
+        text = self._extract_text_from_file(file_path, cache)
+        
+        # Don't remember failures so they are retried next time
+        if cache and text and not text.startswith("Error extracting text from PDF"):
+            with self._text_memo_lock:
+                self._text_memo[key] = text
+                self._text_memo.move_to_end(key)
+                if len(self._text_memo) > _TEXT_MEMO_SIZE:
+                    self._text_memo.popitem(last=False)
+        
+        return text
+
+    def _extract_text_from_file(self, file_path: str, cache: bool) -> str:
+        """Extract text from an existing file, consulting the on-disk cache."""
         file_extension = os.path.splitext(file_path)[1].lower()
         
+        # PDFs have their own cache handling, and plain text is as cheap to read as a cache entry
+        cache_file = None
+        if cache and file_extension in ('.docx', '.ipynb'):
+            cache_file = self._get_cache_file(file_path, file_extension)
+            if cache_file is not None:
+                cached = self._read_cache_file(cache_file)
+                if cached is not None:
+                    logger.info(f"Using cached extraction for: {file_path}")
+                    return cached
+        
         try:
             if file_extension == '.pdf':
-                return self._process_pdf(file_path)
+                return self._process_pdf_with_method(file_path, cache=cache)[0]
             elif file_extension == '.txt':
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                except UnicodeDecodeError:
-                    # Try with different encodings
-                    try:
-                        with open(file_path, 'r', encoding='latin-1') as f:
-                            return f.read()
-                    except Exception as e:
-                        logger.error(f"Failed to read text file with multiple encodings: {e}")
-                        return ""
-            elif file_extension == '.docx':
-                return self._process_docx(file_path)
-            elif file_extension == '.ipynb':
-                return self._process_notebook(file_path)
+                    return _read_text_file(file_path)
+                except Exception as e:
+                    logger.error(f"Failed to read text file {file_path}: {e}")
+                    return ""
+            elif file_extension in ('.docx', '.ipynb'):
+                if file_extension == '.docx':
+                    text = self._process_docx(file_path)
+                else:
+                    text = self._process_notebook(file_path)
+                # Empty text means parsing failed, so leave it to be retried
+                if cache_file is not None and text:
+                    self._write_cache_file(cache_file, text)
+                return text
             else:
                 logger.warning(f"Unsupported file extension: {file_extension}")
                 return ""
         except Exception as e:
             logger.error(f"Error extracting text from file {file_path}: {e}")
             return ""
+
+# Per-process FilePreprocessor used by submission extraction workers
+_worker_preprocessor = None
+
+def _init_submission_worker(output_dir: str, save_ocr_files: bool, cache_dir: str,
+                            gemini_api_key: Optional[str]) -> None:
+    """
+    Process pool initializer: build one FilePreprocessor per worker, without a database connection.
+    
+    Spawned workers start with an unconfigured Gemini client, so the parent's
+    API key is passed in and applied here; without it image descriptions
+    would fail and fall back to bare dimensions.
+    """
+    global _worker_preprocessor
+    if gemini_api_key:
+        _lazy_genai().configure(api_key=gemini_api_key)
+    _worker_preprocessor = FilePreprocessor(
+        custom_output_path=output_dir,
+        save_ocr_files=save_ocr_files,
+        connect_db=False,
+        cache_dir=cache_dir
+    )
+
+def _extract_one_submission(file_path: str) -> str:
+    """Extract a single submission's text inside a worker process."""
+    return _worker_preprocessor._extract_submission_text(Path(file_path))
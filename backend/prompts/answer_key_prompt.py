@@ -1,4 +1,4 @@
-import json
+from prompts.json_utils import dumps_rubric
 
 def get_answer_key_prompt(questions_text: str, rubric: dict) -> str:
     return f"""
@@ -23,7 +23,7 @@ Questions:
 {questions_text}
 
 Rubric:
-{json.dumps(rubric, indent=2)}
+{dumps_rubric(rubric)}
 
 Ensure the JSON structure is valid and nothing else is output.
 """
@@ -1,5 +1,70 @@
+import functools
 from typing import Dict, Any, Optional, List
 
+# Map strictness level to descriptions
+_STRICTNESS_DESCRIPTIONS = {
+    1: "Be lenient and give students the benefit of the doubt.",
+    2: "Be somewhat lenient but ensure key concepts are addressed.",
+    3: "Apply standard academic expectations.",
+    4: "Be somewhat strict and expect thorough understanding.",
+    5: "Be very strict and expect detailed, precise answers."
+}
+
+# Define tone adjustments
+_TONE_INSTRUCTIONS = {
+    "constructive": "Focus on actionable improvements while acknowledging strengths.",
+    "encouraging": "Emphasize strengths and progress while gently noting areas for improvement.",
+    "critical": "Provide direct, candid feedback on weaknesses with clear expectations for improvement."
+}
+
+# The system messages only depend on strictness/tone, so each variant is built once
+@functools.lru_cache(maxsize=32)
+def _grading_system_content(strictness_level: int) -> str:
+    strictness_text = _STRICTNESS_DESCRIPTIONS.get(strictness_level, _STRICTNESS_DESCRIPTIONS[3])
+    return f"""You are an experienced educational grader with expertise in assessing student submissions.
+        
+Your task is to grade a student's submission based on the provided question, model answer, and rubric.
+
+GRADING INSTRUCTIONS:
+1. Carefully analyze the student submission against the rubric criteria
+2. Identify specific strengths and weaknesses
+3. Provide constructive feedback
+4. Apply a strictness level of {strictness_level}/5: {strictness_text}
+5. Remain objective and consistent in your evaluation
+
+After grading, provide your response in this exact JSON format:
+{{
+    "score": <numerical_score>,
+    "total": <total_possible_points>,
+    "mistakes": {{
+        "error1": "description of the first error or misconception",
+        "error2": "description of the second error or misconception",
+        ...
+    }},
+    "grading_feedback": "Detailed feedback explaining the grade with specific examples from the submission"
+}}
+
+Return ONLY the JSON object with no additional text before or after.
+"""
+
+@functools.lru_cache(maxsize=32)
+def _feedback_system_content(tone: str) -> str:
+    tone_instruction = _TONE_INSTRUCTIONS.get(tone, _TONE_INSTRUCTIONS["constructive"])
+    return f"""You are an experienced educator providing personalized feedback to a student.
+
+Your task is to generate detailed, helpful feedback on the student's submission that will help them improve.
+
+FEEDBACK INSTRUCTIONS:
+1. Use a {tone} tone: {tone_instruction}
+2. Start with a brief summary of the student's performance
+3. Highlight specific strengths from the submission
+4. Address key areas for improvement based on the identified mistakes
+5. Provide specific examples and suggestions for how to improve
+6. End with encouragement and next steps
+
+Your feedback should be personalized, specific, and actionable.
+"""
+
 def create_grading_chat_prompt(
     question_text: str, 
     model_answer: str, 
@@ -21,13 +86,12 @@ def create_grading_chat_prompt(
         List of message dictionaries in chat format
     """
     # Format rubric criteria for better readability
-    rubric_text = ""
     if "criteria" in rubric and isinstance(rubric["criteria"], list):
-        for i, criterion in enumerate(rubric["criteria"], 1):
-            name = criterion.get("name", f"Criterion {i}")
-            description = criterion.get("description", "")
-            points = criterion.get("points", 0)
-            rubric_text += f"• {name} ({points} points): {description}\n"
+        rubric_text = "".join(
+            f"• {criterion.get('name', f'Criterion {i}')} ({criterion.get('points', 0)} points): "
+            f"{criterion.get('description', '')}\n"
+            for i, criterion in enumerate(rubric["criteria"], 1)
+        )
     else:
         # Simple rubric format
         max_score = rubric.get("max_score", 100)
@@ -35,45 +99,10 @@ def create_grading_chat_prompt(
         if "description" in rubric:
             rubric_text += rubric["description"]
 
-    # Map strictness level to descriptions
-    strictness_descriptions = {
-        1: "Be lenient and give students the benefit of the doubt.",
-        2: "Be somewhat lenient but ensure key concepts are addressed.",
-        3: "Apply standard academic expectations.",
-        4: "Be somewhat strict and expect thorough understanding.",
-        5: "Be very strict and expect detailed, precise answers."
-    }
-    
-    strictness_text = strictness_descriptions.get(strictness_level, strictness_descriptions[3])
-    
     # Create the system message with all context
     system_message = {
         "role": "system",
-        "content": f"""You are an experienced educational grader with expertise in assessing student submissions.
-        
-Your task is to grade a student's submission based on the provided question, model answer, and rubric.
-
-GRADING INSTRUCTIONS:
-1. Carefully analyze the student submission against the rubric criteria
-2. Identify specific strengths and weaknesses
-3. Provide constructive feedback
-4. Apply a strictness level of {strictness_level}/5: {strictness_text}
-5. Remain objective and consistent in your evaluation
-
-After grading, provide your response in this exact JSON format:
-{{
-    "score": <numerical_score>,
-    "total": <total_possible_points>,
-    "mistakes": {{
-        "error1": "description of the first error or misconception",
-        "error2": "description of the second error or misconception",
-        ...
-    }},
-    "grading_feedback": "Detailed feedback explaining the grade with specific examples from the submission"
-}}
-
-Return ONLY the JSON object with no additional text before or after.
-"""
+        "content": _grading_system_content(strictness_level)
     }
     
     # Create the user message with the actual content to grade
@@ -122,41 +151,16 @@ def create_feedback_chat_prompt(
     mistakes = grading_results.get("mistakes", {})
     grading_feedback = grading_results.get("grading_feedback", "")
     
-    # Define tone adjustments
-    tone_instructions = {
-        "constructive": "Focus on actionable improvements while acknowledging strengths.",
-        "encouraging": "Emphasize strengths and progress while gently noting areas for improvement.",
-        "critical": "Provide direct, candid feedback on weaknesses with clear expectations for improvement."
-    }
-    
-    tone_instruction = tone_instructions.get(tone, tone_instructions["constructive"])
-    
     # Create the system message
     system_message = {
         "role": "system",
-        "content": f"""You are an experienced educator providing personalized feedback to a student.
-
-Your task is to generate detailed, helpful feedback on the student's submission that will help them improve.
-
-FEEDBACK INSTRUCTIONS:
-1. Use a {tone} tone: {tone_instruction}
-2. Start with a brief summary of the student's performance
-3. Highlight specific strengths from the submission
-4. Address key areas for improvement based on the identified mistakes
-5. Provide specific examples and suggestions for how to improve
-6. End with encouragement and next steps
-
-Your feedback should be personalized, specific, and actionable.
-"""
+        "content": _feedback_system_content(tone)
     }
     
     # Format mistakes for the prompt
-    mistakes_text = ""
-    for i, (error, description) in enumerate(mistakes.items(), 1):
-        mistakes_text += f"{i}. {error}: {description}\n"
-    
-    if not mistakes_text:
-        mistakes_text = "No specific mistakes were identified."
+    mistakes_text = "".join(
+        f"{i}. {error}: {description}\n" for i, (error, description) in enumerate(mistakes.items(), 1)
+    ) or "No specific mistakes were identified."
     
     # Create the user message
     user_message = {
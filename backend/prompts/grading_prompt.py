@@ -1,41 +1,11 @@
-import json
+from string import Formatter
+from typing import Tuple
 
-def get_grading_prompt(question_text: str, answer_key: str, submission: str, rubric: dict, strictness_level: int = 3) -> str:
-    """
-    Generates a grading prompt using the ReAct framework with few-shot examples.
-    
-    Parameters:
-    - question_text (str): The exam question.
-    - answer_key (str): The model answer or key points expected. Can be empty if not available.
-    - submission (str): The student's submission.
-    - rubric (dict): A dictionary detailing the grading rubric with point allocations.
-    - strictness_level (int): An integer from 0 (most lenient) to 5 (most strict) indicating grading strictness.
-    
-    Returns:
-    - str: A formatted prompt string ready for use with a language model.
-    """
-    
-    # Format the rubric as a JSON string with indentation for readability
-    rubric_json = json.dumps(rubric, indent=2)
-    
-    # Map strictness level to descriptive term
-    strictness_terms = {
-        0: "very lenient",
-        1: "lenient",
-        2: "moderately lenient",
-        3: "moderate",
-        4: "moderately strict",
-        5: "strict"
-    }
-    
-    strictness_desc = strictness_terms.get(strictness_level, "moderate")
-    
-    # Adjust expected score range based on strictness
-    min_score_pct = 95 - (strictness_level * 5)
-    max_score_pct = 100 - (strictness_level * 2)
-    
-    # Construct the prompt
-    prompt = f"""You are an experienced instructor tasked with evaluating a student's exam submission. Utilize the provided question, rubric, and student response to assess the submission. Follow the ReAct (Reasoning and Acting) framework to ensure a thorough and structured evaluation.
+from prompts.json_utils import dumps_rubric
+
+# Instructions and few-shot example shared by every grading prompt. Keeping this
+# identical and first lets providers with prompt caching reuse it across calls.
+GRADING_PROMPT_PREFIX = """You are an experienced instructor tasked with evaluating a student's exam submission. Utilize the provided question, rubric, and student response to assess the submission. Follow the ReAct (Reasoning and Acting) framework to ensure a thorough and structured evaluation.
 
 ---
 
@@ -47,25 +17,25 @@ def get_grading_prompt(question_text: str, answer_key: str, submission: str, rub
 Explain the concept of Newton's First Law of Motion.
 
 **Rubric:**
-{{
+{
   "criteria": [
-    {{
+    {
       "name": "Definition Accuracy",
       "max_points": 5,
       "description": "Accuracy and completeness of the definition"
-    }},
-    {{
+    },
+    {
       "name": "Example Provided",
       "max_points": 3,
       "description": "Quality and relevance of examples"
-    }},
-    {{
+    },
+    {
       "name": "Clarity of Explanation",
       "max_points": 2,
       "description": "Overall clarity and organization"
-    }}
+    }
   ]
-}}
+}
 
 **Student Submission:**
 "Newton's First Law states that an object will stay at rest or keep moving unless something makes it change."
@@ -79,47 +49,50 @@ Thought: The explanation is somewhat clear but could be more precise.
 Action: Assess "Clarity of Explanation" - Deduct 1 point for lack of precision.
 
 **Final JSON Output:**
-{{
+{
   "student_name": "",
   "score": 4,
   "total": 10,
   "criteria_scores": [
-    {{
+    {
       "name": "Definition Accuracy",
       "points": 3,
       "max_points": 5,
       "feedback": "Missing key terms such as 'inertia' and 'net external force'."
-    }},
-    {{
+    },
+    {
       "name": "Example Provided",
       "points": 0,
       "max_points": 3,
       "feedback": "No example was provided to illustrate the concept."
-    }},
-    {{
+    },
+    {
       "name": "Clarity of Explanation",
       "points": 1,
       "max_points": 2,
       "feedback": "Explanation lacks precision and could be clearer."
-    }}
+    }
   ],
-  "mistakes": {{
+  "mistakes": {
     "1": "Missing key terms such as 'inertia' and 'net external force'.",
     "2": "No example was provided to illustrate the concept.",
     "3": "Explanation lacks precision and could be clearer."
-  }},
+  },
   "grading_feedback": "The submission shows a basic understanding but lacks key terminology and an illustrative example. Improve clarity and include examples to enhance your explanation."
-}}
+}
 
 ---
 
 **Now, proceed to evaluate the following submission:**
 
-**Question:**
+"""
+
+# Submission-specific part of the grading prompt, filled in with str.format_map
+_SUBMISSION_TEMPLATE = """**Question:**
 {question_text}
 
 **Answer Key:**
-{answer_key if answer_key else "No specific answer key provided. Use your expert judgment."}
+{answer_key}
 
 **Rubric:**
 {rubric_json}
@@ -166,4 +139,87 @@ With this strictness level, the score should typically fall between {min_score_p
 
 Begin your evaluation now.
 """
-    return prompt
+
+# Descriptive term for each strictness level, indexed by level
+_STRICTNESS_TERMS = (
+    "very lenient",
+    "lenient",
+    "moderately lenient",
+    "moderate",
+    "moderately strict",
+    "strict"
+)
+_STRICTNESS_LEVELS = range(len(_STRICTNESS_TERMS))
+
+def _specialize_template(strictness_level: int) -> str:
+    """
+    Fill the strictness fields of _SUBMISSION_TEMPLATE, leaving the submission fields as placeholders.
+    """
+    values = {
+        "strictness_desc": _STRICTNESS_TERMS[int(strictness_level)] if strictness_level in _STRICTNESS_LEVELS else "moderate",
+        "strictness_level": strictness_level,
+        # Adjust expected score range based on strictness
+        "min_score_pct": 95 - (strictness_level * 5),
+        "max_score_pct": 100 - (strictness_level * 2)
+    }
+    
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(_SUBMISSION_TEMPLATE):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field in values:
+            parts.append(str(values[field]).replace("{", "{{").replace("}", "}}"))
+        else:
+            parts.append("{" + field + "}")
+    return "".join(parts)
+
+# Submission templates with the strictness wording and score range already
+# filled in for each level, so a call only substitutes the four per-submission fields
+_TEMPLATES = tuple(_specialize_template(level) for level in _STRICTNESS_LEVELS)
+
+def get_grading_prompt(question_text: str, answer_key: str, submission: str, rubric: dict, strictness_level: int = 3) -> str:
+    """
+    Generates a grading prompt using the ReAct framework with few-shot examples.
+    
+    The prompt is GRADING_PROMPT_PREFIX followed by the submission-specific part;
+    use get_grading_prompt_parts to send the two separately.
+    
+    Parameters:
+    - question_text (str): The exam question.
+    - answer_key (str): The model answer or key points expected. Can be empty if not available.
+    - submission (str): The student's submission.
+    - rubric (dict): A dictionary detailing the grading rubric with point allocations.
+    - strictness_level (int): An integer from 0 (most lenient) to 5 (most strict) indicating grading strictness.
+    
+    Returns:
+    - str: A formatted prompt string ready for use with a language model.
+    """
+    prefix, submission_part = get_grading_prompt_parts(question_text, answer_key, submission, rubric, strictness_level)
+    return prefix + submission_part
+
+def get_grading_prompt_parts(question_text: str, answer_key: str, submission: str, rubric: dict, strictness_level: int = 3) -> Tuple[str, str]:
+    """
+    Generates the grading prompt as a static prefix and a submission-specific part.
+    
+    Parameters are the same as for get_grading_prompt.
+    
+    Returns:
+    - Tuple[str, str]: GRADING_PROMPT_PREFIX, which never changes and can be marked
+      for prompt caching, and the part built from this question and submission.
+    """
+    
+    # Format the rubric as a JSON string with indentation for readability
+    rubric_json = dumps_rubric(rubric)
+    
+    if type(strictness_level) is int and 0 <= strictness_level < len(_TEMPLATES):
+        template = _TEMPLATES[strictness_level]
+    else:
+        template = _specialize_template(strictness_level)
+    
+    return GRADING_PROMPT_PREFIX, template.format_map({
+        "question_text": question_text,
+        "answer_key": answer_key if answer_key else "No specific answer key provided. Use your expert judgment.",
+        "rubric_json": rubric_json,
+        "submission": submission
+    })
@@ -1,5 +1,5 @@
-def get_image_description_prompt() -> str:
-    return """
+# Shared by every image description request, so it is built once at import
+IMAGE_DESCRIPTION_PROMPT = """
     You are an expert in analyzing technical screenshots and images—especially those embedded within PDF documents—and your task is to provide a detailed summary for grading purposes. When reviewing any given image, please include the following in your analysis:
 
 • Identify the type and purpose of the interface or system shown, such as command-line interfaces, web-based dashboards, code editors, configuration panels, etc.
@@ -9,4 +9,8 @@ def get_image_description_prompt() -> str:
 • Mention any design elements, layout considerations, or interface components that enhance usability or contribute to understanding the technical content.
 
 Your description should be concise yet comprehensive, technically accurate, and tailored for academic or professional grading, avoiding trivial observations while focusing on actionable insights.
-    """ 
\ No newline at end of file
+    """
+
+
+def get_image_description_prompt() -> str:
+    return IMAGE_DESCRIPTION_PROMPT
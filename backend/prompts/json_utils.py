@@ -0,0 +1,30 @@
+import functools
+import json
+
+
+def dumps_indented(data) -> str:
+    """
+    Serialize data as 2-space indented JSON for embedding in a prompt.
+    
+    This is exactly json.dumps(data, indent=2), including its escaping of
+    non-ASCII characters, so prompts read the same as before the rubric
+    cache was added.
+    """
+    return json.dumps(data, indent=2)
+
+
+@functools.lru_cache(maxsize=256)
+def _indent_compact_json(compact: str) -> str:
+    return dumps_indented(json.loads(compact))
+
+
+def dumps_rubric(rubric) -> str:
+    """
+    Serialize a rubric for a prompt, reusing the result for rubrics seen before.
+    
+    The rubric is first encoded compactly, which runs in the C encoder, and the
+    compact text keys a cache of indented dumps. Grading a batch against one
+    rubric therefore builds the indented JSON once, and an edited rubric gets a
+    new key instead of a stale entry.
+    """
+    return _indent_compact_json(json.dumps(rubric, separators=(',', ':')))
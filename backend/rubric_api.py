@@ -7,67 +7,220 @@ Rubric Management API Endpoints
 @repository: https://github.com/Dead-Stone/ScorePAL
 """
 
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from typing import Dict, List, Any, Optional
-from models.rubric import Rubric, GradingCriteria
-from rubric_generation import get_rubric_from_text
+from models.rubric import Rubric, GradingCriteria, now_iso
+from rubric_generation import get_rubric_from_text_async
+import asyncio
 import json
 import os
 import logging
-import uuid
-from datetime import datetime
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
+try:
+    import aiofiles
+    import aiofiles.os
+    aiofiles_available = True
+except ImportError:
+    aiofiles_available = False
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Initialize router
-router = APIRouter()
-
-# In-memory store for rubrics (in a production app, this would be a database)
-# This will be initialized with sample rubrics on startup
-RUBRICS = {}
+# Initialize router; ORJSONResponse needs orjson at render time
+router = APIRouter(default_response_class=ORJSONResponse if orjson_available else JSONResponse)
 
 # Directory for storing rubrics
 RUBRICS_DIR = Path("data/rubrics")
 RUBRICS_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_rubrics_from_disk():
-    """Load saved rubrics from disk"""
+# Rubric loading is disk-bound, so use more threads than cores
+_LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson_available:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _dumps(data: Any) -> bytes:
+    """Serialize data as 2-space indented JSON bytes, using orjson when it is installed"""
+    if orjson_available:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+def _load_rubric_file(rubric_file: Path) -> Optional[Rubric]:
+    """Load one rubric file, returning None if it cannot be read or parsed"""
+    try:
+        return Rubric.from_dict(_loads(rubric_file.read_bytes()))
+    except Exception as e:
+        logger.error(f"Error loading rubric from {rubric_file}: {e}")
+        return None
+
+class _LazyRubricStore(dict):
+    """
+    Rubric store that parses each rubric file the first time it is accessed.
+    
+    Startup only records the path of every rubric file, keyed by the rubric ID
+    in its file name, so a request touches just the rubrics it uses. Parsed
+    rubrics are stored under the ID inside the file. save_rubric_to_disk always
+    writes {id}.json, but a file named otherwise is still found: a lookup that
+    misses loads the remaining files once.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._paths: Dict[str, Path] = {}
+    
+    def index(self, paths: Dict[str, Path]):
+        """Record rubric file paths for rubrics that are not already in memory"""
+        for rubric_id, path in paths.items():
+            if not dict.__contains__(self, rubric_id):
+                self._paths[rubric_id] = path
+    
+    def _load(self, rubric_id: str) -> Optional[Rubric]:
+        path = self._paths.pop(rubric_id, None)
+        if path is not None:
+            rubric = _load_rubric_file(path)
+            # A rubric already in memory wins over its file
+            if rubric is not None and not dict.__contains__(self, rubric.id):
+                dict.__setitem__(self, rubric.id, rubric)
+        rubric = dict.get(self, rubric_id)
+        if rubric is None and self._paths:
+            # No file is named after this ID, so look inside the rest
+            self.load_all()
+            rubric = dict.get(self, rubric_id)
+        return rubric
+    
+    def load_all(self) -> int:
+        """Parse every indexed rubric that is not loaded yet, returning how many loaded"""
+        pending = list(self._paths.items())
+        if not pending:
+            return 0
+        with ThreadPoolExecutor(max_workers=_LOAD_WORKERS) as executor:
+            rubrics = list(executor.map(_load_rubric_file, [path for _, path in pending]))
+        for rubric_id, _ in pending:
+            self._paths.pop(rubric_id, None)
+        
+        # Merge in one update so readers never see a half-loaded store
+        loaded = {
+            rubric.id: rubric for rubric in rubrics
+            if rubric is not None and not dict.__contains__(self, rubric.id)
+        }
+        dict.update(self, loaded)
+        return len(loaded)
+    
+    def __missing__(self, rubric_id):
+        rubric = self._load(rubric_id)
+        if rubric is None:
+            raise KeyError(rubric_id)
+        return rubric
+    
+    def __contains__(self, rubric_id):
+        return dict.__contains__(self, rubric_id) or self._load(rubric_id) is not None
+    
+    def __len__(self):
+        return dict.__len__(self) + len(self._paths)
+    
+    def get(self, rubric_id, default=None):
+        return self[rubric_id] if rubric_id in self else default
+    
+    def __setitem__(self, rubric_id, rubric):
+        self._paths.pop(rubric_id, None)
+        dict.__setitem__(self, rubric_id, rubric)
+    
+    def __delitem__(self, rubric_id):
+        if rubric_id not in self:
+            raise KeyError(rubric_id)
+        dict.__delitem__(self, rubric_id)
+
+# In-memory store for rubrics (in a production app, this would be a database)
+# This will be initialized with sample rubrics on startup
+RUBRICS = _LazyRubricStore()
+
+def _index_rubrics():
+    """Index the rubric files on disk without parsing them"""
     try:
         if not RUBRICS_DIR.exists():
             logger.warning(f"Rubrics directory {RUBRICS_DIR} does not exist, creating it")
             RUBRICS_DIR.mkdir(parents=True, exist_ok=True)
             return
-            
-        count = 0
-        for rubric_file in RUBRICS_DIR.glob("*.json"):
-            try:
-                with open(rubric_file, 'r') as f:
-                    rubric_data = json.load(f)
-                    rubric = Rubric.from_dict(rubric_data)
-                    RUBRICS[rubric.id] = rubric
-                    count += 1
-            except Exception as e:
-                logger.error(f"Error loading rubric from {rubric_file}: {e}")
         
-        logger.info(f"Loaded {count} rubrics from disk")
+        with os.scandir(RUBRICS_DIR) as entries:
+            paths = {
+                entry.name[:-len(".json")]: Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            }
+        RUBRICS.index(paths)
+        logger.info(f"Indexed {len(paths)} rubrics on disk")
         
-        # If no rubrics were loaded, add the default one
+        # If there are no rubrics, add the default one
         if not RUBRICS:
             default_rubric = Rubric.create_default()
             RUBRICS[default_rubric.id] = default_rubric
-            save_rubric_to_disk(default_rubric)
+            _save_sync(default_rubric)
             logger.info("Created default rubric")
+    except Exception as e:
+        logger.error(f"Error indexing rubrics: {e}")
+
+def load_rubrics_from_disk():
+    """Load saved rubrics from disk"""
+    try:
+        _index_rubrics()
+        count = RUBRICS.load_all()
+        logger.info(f"Loaded {count} rubrics from disk")
     except Exception as e:
         logger.error(f"Error loading rubrics: {e}")
 
-def save_rubric_to_disk(rubric: Rubric):
-    """Save a rubric to disk"""
+def _tmp_path(rubric_path: Path) -> Path:
+    """Unique temporary path next to rubric_path; it does not end in .json, so indexing skips it"""
+    return rubric_path.with_name(f"{rubric_path.name}.tmp.{secrets.token_hex(4)}")
+
+def _write_atomic(rubric_path: Path, data: bytes):
+    """Write a rubric file through a temporary file so readers never see a partial write"""
+    tmp_path = _tmp_path(rubric_path)
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, rubric_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _save_sync(rubric: Rubric):
+    """Save a rubric to disk from synchronous code such as startup"""
+    try:
+        rubric_path = RUBRICS_DIR / f"{rubric.id}.json"
+        _write_atomic(rubric_path, _dumps(rubric.to_dict()))
+        logger.info(f"Saved rubric {rubric.id} to disk")
+    except Exception as e:
+        logger.error(f"Error saving rubric {rubric.id} to disk: {e}")
+
+async def save_rubric_to_disk(rubric: Rubric):
+    """Save a rubric to disk without blocking the event loop"""
     try:
         rubric_path = RUBRICS_DIR / f"{rubric.id}.json"
-        with open(rubric_path, 'w') as f:
-            json.dump(rubric.to_dict(), f, indent=2)
+        data = _dumps(rubric.to_dict())
+        if aiofiles_available:
+            tmp_path = _tmp_path(rubric_path)
+            try:
+                async with aiofiles.open(tmp_path, 'wb') as f:
+                    await f.write(data)
+                await aiofiles.os.replace(tmp_path, rubric_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        else:
+            await asyncio.to_thread(_write_atomic, rubric_path, data)
         logger.info(f"Saved rubric {rubric.id} to disk")
     except Exception as e:
         logger.error(f"Error saving rubric {rubric.id} to disk: {e}")
@@ -76,14 +229,20 @@ def save_rubric_to_disk(rubric: Rubric):
 async def get_rubrics():
     """Get all available rubrics"""
     try:
-        # Make sure rubrics are loaded
-        if not RUBRICS:
-            load_rubrics_from_disk()
+        # Parse any rubrics that have only been indexed so far
+        await asyncio.to_thread(RUBRICS.load_all)
             
-        return {
-            "status": "success",
-            "rubrics": [rubric.to_dict() for rubric in RUBRICS.values()]
-        }
+        # Stream each rubric's cached JSON inside the envelope instead of re-encoding,
+        # so only one rubric's bytes are in flight at a time
+        rubrics = list(RUBRICS.values())
+        
+        async def generate():
+            yield b'{"status":"success","rubrics":['
+            for i, rubric in enumerate(rubrics):
+                yield b',' + rubric.to_json_bytes() if i else rubric.to_json_bytes()
+            yield b']}'
+        
+        return StreamingResponse(generate(), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting rubrics: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting rubrics: {str(e)}")
@@ -95,10 +254,8 @@ async def get_rubric(rubric_id: str):
         if rubric_id not in RUBRICS:
             raise HTTPException(status_code=404, detail=f"Rubric with ID {rubric_id} not found")
             
-        return {
-            "status": "success",
-            "rubric": RUBRICS[rubric_id].to_dict()
-        }
+        content = b'{"status":"success","rubric":' + RUBRICS[rubric_id].to_json_bytes() + b'}'
+        return Response(content=content, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -111,10 +268,10 @@ async def create_rubric(rubric_data: Dict[str, Any] = Body(...)):
     try:
         # Generate a new ID if not provided
         if "id" not in rubric_data:
-            rubric_data["id"] = f"rubric_{uuid.uuid4().hex[:8]}"
+            rubric_data["id"] = f"rubric_{secrets.token_hex(4)}"
             
         # Set timestamps
-        now = datetime.now().isoformat()
+        now = now_iso()
         rubric_data["created_at"] = now
         rubric_data["updated_at"] = now
         
@@ -123,7 +280,7 @@ async def create_rubric(rubric_data: Dict[str, Any] = Body(...)):
         
         # Store the rubric
         RUBRICS[rubric.id] = rubric
-        save_rubric_to_disk(rubric)
+        await save_rubric_to_disk(rubric)
         
         return {
             "status": "success",
@@ -147,7 +304,7 @@ async def generate_rubric(data: Dict[str, Any] = Body(...)):
             context = "Create a detailed grading rubric with specific criteria and point allocations."
             
         # Generate the rubric using the AI with API key from environment
-        generated_data = get_rubric_from_text(question, context)
+        generated_data = await get_rubric_from_text_async(question, context)
         
         # Create a proper Rubric object
         criteria_list = []
@@ -184,8 +341,8 @@ async def generate_rubric(data: Dict[str, Any] = Body(...)):
             ))
         
         # Create the rubric
-        rubric_id = f"rubric_{uuid.uuid4().hex[:8]}"
-        now = datetime.now().isoformat()
+        rubric_id = f"rubric_{secrets.token_hex(4)}"
+        now = now_iso()
         
         rubric = Rubric(
             id=rubric_id,
@@ -198,7 +355,7 @@ async def generate_rubric(data: Dict[str, Any] = Body(...)):
         
         # Store the rubric
         RUBRICS[rubric.id] = rubric
-        save_rubric_to_disk(rubric)
+        await save_rubric_to_disk(rubric)
         
         return {
             "status": "success",
@@ -220,14 +377,18 @@ async def update_rubric(rubric_id: str, rubric_data: Dict[str, Any] = Body(...))
         original_rubric = RUBRICS[rubric_id]
         rubric_data["id"] = rubric_id
         rubric_data["created_at"] = original_rubric.created_at
-        rubric_data["updated_at"] = datetime.now().isoformat()
+        rubric_data["updated_at"] = now_iso()
         
-        # Create the updated rubric object
-        updated_rubric = Rubric.from_dict(rubric_data)
+        # The body replaces the whole rubric; criteria identical to the stored ones
+        # are reused instead of rebuilt
+        criteria = None
+        if rubric_data.get("criteria", []) == original_rubric.to_dict()["criteria"]:
+            criteria = list(original_rubric.criteria)
+        updated_rubric = Rubric.from_dict(rubric_data, criteria=criteria)
         
         # Store the updated rubric
         RUBRICS[rubric_id] = updated_rubric
-        save_rubric_to_disk(updated_rubric)
+        await save_rubric_to_disk(updated_rubric)
         
         return {
             "status": "success",
@@ -252,8 +413,10 @@ async def delete_rubric(rubric_id: str):
         
         # Delete from disk
         rubric_path = RUBRICS_DIR / f"{rubric_id}.json"
-        if rubric_path.exists():
-            rubric_path.unlink()
+        try:
+            await asyncio.to_thread(rubric_path.unlink)
+        except FileNotFoundError:
+            pass
             
         return {
             "status": "success",
@@ -265,5 +428,5 @@ async def delete_rubric(rubric_id: str):
         logger.error(f"Error deleting rubric {rubric_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Error deleting rubric: {str(e)}")
 
-# Initialize by loading existing rubrics
-load_rubrics_from_disk() 
\ No newline at end of file
+# Initialize by indexing existing rubrics; each one is parsed on first use
+_index_rubrics() 
\ No newline at end of file
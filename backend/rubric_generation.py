@@ -1,52 +1,74 @@
 import os
 import json
 import re
+import asyncio
+import functools
 import logging
+import weakref
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
 import google.generativeai as genai
 from google.generativeai import types
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-def get_rubric_from_text(question: str, rubric_text: str, api_key: str = None) -> dict:
-    """
-    Generate a detailed grading rubric in JSON format using Gemini 2.0 Flash.
-    
-    The generated rubric must meet these conditions:
-      - It contains a "total_points" field that is exactly 20.
-      - It contains a "sections" array. Each section represents a question and must include:
-            "question": a short title or identifier for the question,
-            "max_points": an integer indicating the points allocated for that question,
-            "criteria": an array of grading criteria (each with "name", "points", and "description").
-      - The sum of "max_points" across all sections must equal 20.
-      - Output only valid JSON without any extra text.
-    
-    Args:
-        question (str): Question paper or prompt.
-        rubric_text (str): Additional context or instructions.
-        api_key (str, optional): Gemini API key. If not provided, will try to get from env.
+_MODEL_NAME = "gemini-1.5-flash"
+
+# Stream Gemini responses and stop reading once the rubric JSON is complete;
+# set RUBRIC_STREAM_RESPONSES=0 to wait for the full response instead
+_STREAM_RESPONSES = os.environ.get("RUBRIC_STREAM_RESPONSES", "1") != "0"
+
+# Characters that matter when scanning for the end of a JSON object
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+# API key genai is currently configured with, so repeat calls skip reconfiguring
+_configured_api_key = None
+
+# Models for async calls, one per event loop because the SDK binds its async
+# client to the loop that first uses it
+_async_models = weakref.WeakKeyDictionary()
+
+def _configure(api_key: str = None):
+    """Configure genai with the given API key, or GEMINI_API_KEY from the environment."""
+    global _configured_api_key
     
-    Returns:
-        dict: The generated rubric.
-        
-    Raises:
-        Exception: If generation or JSON extraction fails.
-    """
-    try:
-        # Get API key from parameter or environment variable
-        if not api_key:
-            api_key = os.environ.get("GEMINI_API_KEY")
-            
-        if not api_key:
-            raise ValueError("No Gemini API key provided and GEMINI_API_KEY environment variable is not set.")
+    # Get API key from parameter or environment variable
+    if not api_key:
+        api_key = os.environ.get("GEMINI_API_KEY")
         
-        # Configure Gemini API and instantiate the model
+    if not api_key:
+        raise ValueError("No Gemini API key provided and GEMINI_API_KEY environment variable is not set.")
+    
+    if api_key != _configured_api_key:
         genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        
-        prompt = (
-            """
+        _configured_api_key = api_key
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    return genai.GenerativeModel(_MODEL_NAME)
+
+def _get_async_model():
+    loop = asyncio.get_running_loop()
+    model = _async_models.get(loop)
+    if model is None:
+        model = _async_models[loop] = genai.GenerativeModel(_MODEL_NAME)
+    return model
+
+# Instructions and example rubric shared by every rubric generation prompt.
+# Keeping this identical and first lets providers with prompt caching reuse it.
+RUBRIC_PROMPT_PREFIX = """
             You are an expert in educational assessment and rubric design. Your task is to generate a detailed grading rubric in JSON format based on the given criteria. The rubric should be structured with clear sections, each containing multiple criteria with assigned points, descriptions, and response levels for detailed assessment.
 
             **Instructions:**
@@ -169,10 +191,207 @@ def get_rubric_from_text(question: str, rubric_text: str, api_key: str = None) -
             - The rubric should be applicable to all educational submissions as per their course work.
             - Adapt the rubric to fit different complexity levels and educational standards.
             - Include detailed descriptions for each criterion to guide accurate assessment."""
-            f"Given the quesion paper: {question}"
-            f"Now, generate a JSON rubric tailored to the following context: {rubric_text}"
-            
-        )
+
+# Generated rubrics keyed by a hash of the normalized inputs, so repeated
+# requests (instructors re-running the same assignment, test runs) skip Gemini
+_RUBRIC_CACHE_SIZE = 1024
+_RUBRIC_CACHE_TTL = 24 * 60 * 60
+_rubric_cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+_rubric_cache_lock = threading.Lock()
+
+def _rubric_cache_key(question: str, rubric_text: str) -> str:
+    data = (question or "").strip() + "\x1f" + (rubric_text or "").strip()
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+def _cache_get(key: str):
+    """Return a copy of the cached rubric for key, or None if missing or expired."""
+    with _rubric_cache_lock:
+        entry = _rubric_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, rubric = entry
+        if time.monotonic() - stored_at > _RUBRIC_CACHE_TTL:
+            del _rubric_cache[key]
+            return None
+        _rubric_cache.move_to_end(key)
+    # Callers may edit the rubric they get back
+    return copy.deepcopy(rubric)
+
+def _cache_put(key: str, rubric: dict):
+    with _rubric_cache_lock:
+        _rubric_cache[key] = (time.monotonic(), rubric)
+        _rubric_cache.move_to_end(key)
+        while len(_rubric_cache) > _RUBRIC_CACHE_SIZE:
+            _rubric_cache.popitem(last=False)
+
+def _build_prompt(question: str, rubric_text: str) -> str:
+    return (
+        RUBRIC_PROMPT_PREFIX +
+        f"Given the quesion paper: {question}"
+        f"Now, generate a JSON rubric tailored to the following context: {rubric_text}"
+    )
+
+class _JsonScanner:
+    """
+    Find the first balanced {...} object in text that may arrive in chunks.
+    
+    One forward pass tracks brace depth outside string literals, jumping between
+    braces, quotes and backslashes with a regex so plain text is skipped in C.
+    The scan resumes where it stopped each time more text is fed.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self._start = -1
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+    
+    def feed(self, chunk: str):
+        """Append chunk and return the object once its closing brace has arrived, else None."""
+        self.text += chunk
+        text = self.text
+        if self._start == -1:
+            self._start = text.find('{', self._pos)
+            if self._start == -1:
+                self._pos = len(text)
+                return None
+            self._pos = self._start
+        
+        pos = self._pos
+        while True:
+            match = _JSON_TOKEN_RE.search(text, pos)
+            if match is None:
+                self._pos = pos
+                return None
+            char = match.group()
+            pos = match.end()
+            if self._in_string:
+                if char == '\\':
+                    # Skip the escaped character
+                    pos += 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = pos
+                    return text[self._start:pos]
+
+def _slice_json(text: str):
+    """Return the first balanced {...} object in text, or None if there is none."""
+    return _JsonScanner().feed(text)
+
+def _chunk_text(chunk) -> str:
+    try:
+        return chunk.text
+    except ValueError:
+        # Chunks without text parts, such as a final finish-reason chunk
+        return ""
+
+def _response_stream(chunks):
+    """
+    Return the transport stream behind a streaming Gemini response.
+    
+    The SDK keeps the gRPC call or REST generator in the response's _iterator and
+    has no public way to cancel it, so fall back to chunks itself for other iterables.
+    """
+    return getattr(chunks, "_iterator", None) or chunks
+
+def _close_stream(chunks):
+    """Cancel or close the stream behind chunks so its connection is released now."""
+    stream = _response_stream(chunks)
+    if hasattr(stream, "cancel"):
+        stream.cancel()
+    elif hasattr(stream, "close"):
+        stream.close()
+
+async def _close_stream_async(chunks):
+    """Async version of _close_stream."""
+    stream = _response_stream(chunks)
+    if hasattr(stream, "cancel"):
+        stream.cancel()
+    elif hasattr(stream, "aclose"):
+        await stream.aclose()
+
+def _read_rubric_stream(chunks) -> str:
+    """Read streamed chunks only until the rubric's closing brace arrives, then close the stream."""
+    scanner = _JsonScanner()
+    try:
+        for chunk in chunks:
+            json_text = scanner.feed(_chunk_text(chunk))
+            if json_text is not None:
+                return json_text
+        return scanner.text
+    finally:
+        _close_stream(chunks)
+
+async def _read_rubric_stream_async(chunks) -> str:
+    """Async version of _read_rubric_stream."""
+    scanner = _JsonScanner()
+    try:
+        async for chunk in chunks:
+            json_text = scanner.feed(_chunk_text(chunk))
+            if json_text is not None:
+                return json_text
+        return scanner.text
+    finally:
+        await _close_stream_async(chunks)
+
+def _parse_rubric(response_text: str) -> dict:
+    # Extract the JSON object from the response, ignoring any prose around it
+    json_text = _slice_json(response_text)
+    if json_text is None:
+        # Unbalanced output; keep the old first-to-last brace slice so the
+        # parse error still points at the model's JSON
+        end = response_text.rfind('}')
+        start = response_text.find('{')
+        if start == -1 or end < start:
+            raise ValueError("No JSON content found in the response.")
+        json_text = response_text[start:end + 1]
+    if orjson_available:
+        return orjson.loads(json_text)
+    return json.loads(json_text)
+
+def get_rubric_from_text(question: str, rubric_text: str, api_key: str = None) -> dict:
+    """
+    Generate a detailed grading rubric in JSON format using Gemini 2.0 Flash.
+    
+    The generated rubric must meet these conditions:
+      - It contains a "total_points" field that is exactly 20.
+      - It contains a "sections" array. Each section represents a question and must include:
+            "question": a short title or identifier for the question,
+            "max_points": an integer indicating the points allocated for that question,
+            "criteria": an array of grading criteria (each with "name", "points", and "description").
+      - The sum of "max_points" across all sections must equal 20.
+      - Output only valid JSON without any extra text.
+    
+    Args:
+        question (str): Question paper or prompt.
+        rubric_text (str): Additional context or instructions.
+        api_key (str, optional): Gemini API key. If not provided, will try to get from env.
+    
+    Returns:
+        dict: The generated rubric.
+        
+    Raises:
+        Exception: If generation or JSON extraction fails.
+    """
+    try:
+        key = _rubric_cache_key(question, rubric_text)
+        cached = _cache_get(key)
+        if cached is not None:
+            logger.info("Returning cached rubric for identical question and context")
+            return cached
+        
+        _configure(api_key)
+        model = _get_model()
+        
+        prompt = _build_prompt(question, rubric_text)
         
         generation_config = types.GenerationConfig(
             max_output_tokens=1024,
@@ -181,16 +400,58 @@ def get_rubric_from_text(question: str, rubric_text: str, api_key: str = None) -
         )
         
         # response = model.generate_content(prompt, generation_config=generation_config)
-        response = model.generate_content(prompt)
+        if _STREAM_RESPONSES:
+            response_text = _read_rubric_stream(model.generate_content(prompt, stream=True))
+        else:
+            response_text = model.generate_content(prompt).text
         logger.info(f"Generated response from Gemini for rubric generation")
         
-        # Extract JSON from the response using regex
-        json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
-        if not json_match:
-            raise ValueError("No JSON content found in the response.")
-        json_text = json_match.group(0)
-        rubric = json.loads(json_text)
-        return rubric
+        rubric = _parse_rubric(response_text)
+        _cache_put(key, rubric)
+        return copy.deepcopy(rubric)
+    except Exception as e:
+        logger.error(f"Error generating rubric from text: {e}")
+        raise
+
+async def get_rubric_from_text_async(question: str, rubric_text: str, api_key: str = None) -> dict:
+    """
+    Async version of get_rubric_from_text for use inside the FastAPI event loop.
+    
+    The Gemini call is awaited rather than blocking, so concurrent rubric requests
+    overlap their network round-trips. Use asyncio.gather to generate several at once.
+    
+    Args:
+        question (str): Question paper or prompt.
+        rubric_text (str): Additional context or instructions.
+        api_key (str, optional): Gemini API key. If not provided, will try to get from env.
+    
+    Returns:
+        dict: The generated rubric.
+        
+    Raises:
+        Exception: If generation or JSON extraction fails.
+    """
+    try:
+        key = _rubric_cache_key(question, rubric_text)
+        cached = _cache_get(key)
+        if cached is not None:
+            logger.info("Returning cached rubric for identical question and context")
+            return cached
+        
+        _configure(api_key)
+        model = _get_async_model()
+        
+        prompt = _build_prompt(question, rubric_text)
+        
+        if _STREAM_RESPONSES:
+            response_text = await _read_rubric_stream_async(await model.generate_content_async(prompt, stream=True))
+        else:
+            response_text = (await model.generate_content_async(prompt)).text
+        logger.info(f"Generated response from Gemini for rubric generation")
+        
+        rubric = _parse_rubric(response_text)
+        _cache_put(key, rubric)
+        return copy.deepcopy(rubric)
     except Exception as e:
         logger.error(f"Error generating rubric from text: {e}")
         raise
@@ -203,6 +464,9 @@ if __name__ == "__main__":
     )
     try:
         rubric = get_rubric_from_text("",context)
-        print(json.dumps(rubric, indent=2))
+        if orjson_available:
+            print(orjson.dumps(rubric, option=orjson.OPT_INDENT_2).decode())
+        else:
+            print(json.dumps(rubric, indent=2))
     except Exception as e:
         print(f"Rubric generation failed: {e}")
@@ -3,13 +3,68 @@ Canvas Grading Service for ScorePAL.
 This module handles Canvas LMS integration with our grading system.
 """
 
+import asyncio
+import importlib.util
 import logging
-import requests
+import httpx
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
+# HTTP/2 support in httpx needs the optional h2 package, which httpx imports itself
+http2_available = importlib.util.find_spec("h2") is not None
+
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
 logger = logging.getLogger(__name__)
 
+# Largest page size Canvas allows for list endpoints
+_PER_PAGE = 100
+
+def _response_json(response: httpx.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson_available:
+        return orjson.loads(response.content)
+    return response.json()
+
+# Submission fields passed to the frontend, with their defaults when Canvas omits them
+_SUBMISSION_FIELDS = (
+    ('id', None),
+    ('user_id', None),
+    ('assignment_id', None),
+    ('grade', None),
+    ('score', None),
+    ('submitted_at', None),
+    ('workflow_state', None),
+    ('late', False),
+    ('missing', False),
+    ('graded_at', None),
+    ('preview_url', None)
+)
+
+def _format_submission(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a Canvas submission onto the fields the frontend uses."""
+    get = submission.get
+    formatted = {key: get(key, default) for key, default in _SUBMISSION_FIELDS}
+    formatted['attachments'] = get('attachments', [])
+    if 'user' in submission:
+        formatted['user'] = submission['user']
+    else:
+        formatted['user'] = {'id': formatted['user_id'], 'name': f"User {formatted['user_id']}"}
+    return formatted
+
+def _numbered_page_urls(next_url: str, last_url: str) -> Optional[List[httpx.URL]]:
+    """URLs for pages next..last when both use numeric page parameters, else None."""
+    next_page = httpx.URL(next_url)
+    first = next_page.params.get('page', '')
+    last = httpx.URL(last_url).params.get('page', '')
+    if not (first.isdigit() and last.isdigit()):
+        return None
+    return [next_page.copy_set_param('page', page) for page in range(int(first), int(last) + 1)]
+
 class CanvasGradingService:
     """Service to process Canvas assignments and integrate with grading system."""
     
@@ -25,21 +80,70 @@ class CanvasGradingService:
             'Content-Type': 'application/json'
         }
         
+        # One pooled client so every request reuses the same TCP/TLS connection
+        self.client = httpx.Client(**self._client_options())
+        
+        # Pooled async client, created on first use inside the caller's event loop
+        self._async_client = None
+        
         logger.info("CanvasGradingService initialized")
+    
+    def close(self):
+        """Close the pooled HTTP connections of the sync client."""
+        self.client.close()
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections of both clients."""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return the pooled async client, creating it on first use."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
         
     def test_connection(self) -> bool:
         """Test the Canvas connection."""
         try:
-            response = requests.get(f'{self.canvas_url}/api/v1/users/self', headers=self.headers)
+            response = self.client.get('/api/v1/users/self')
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Canvas connection test failed: {e}")
             return False
             
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            'base_url': self.canvas_url,
+            'headers': self.headers,
+            'http2': http2_available,
+            'timeout': 30.0,
+            'limits': httpx.Limits(max_keepalive_connections=10)
+        }
+    
     def get_submissions_for_assignment(self, course_id: int, assignment_id: int, include: List[str] = None) -> Dict[str, Any]:
         """
         Get submissions for a specific assignment from Canvas API.
         
+        Synchronous counterpart of get_submissions_for_assignment_async. Requests
+        are made one after another on the service's pooled client, so repeated
+        calls reuse its connections. Async callers should await the async method
+        so the event loop isn't blocked.
+        
         Args:
             course_id: Canvas course ID
             assignment_id: Canvas assignment ID  
@@ -49,75 +153,166 @@ class CanvasGradingService:
             Dictionary with success status and submissions data
         """
         try:
-            # Build the API URL
-            url = f'{self.canvas_url}/api/v1/courses/{course_id}/assignments/{assignment_id}/submissions'
-            
-            # Add query parameters
-            params = {}
-            if include:
-                params['include[]'] = include
-                
-            # Make the API request
-            response = requests.get(url, headers=self.headers, params=params)
+            url, params = self._submissions_request(course_id, assignment_id, include)
+            response = self.client.get(url, params=params)
             
             if response.status_code == 200:
-                submissions_data = response.json()
-                
-                # Format submissions for our frontend
-                formatted_submissions = []
-                for submission in submissions_data:
-                    formatted_submission = {
-                        'id': submission.get('id'),
-                        'user_id': submission.get('user_id'),
-                        'assignment_id': submission.get('assignment_id'),
-                        'grade': submission.get('grade'),
-                        'score': submission.get('score'),
-                        'submitted_at': submission.get('submitted_at'),
-                        'workflow_state': submission.get('workflow_state'),
-                        'late': submission.get('late', False),
-                        'missing': submission.get('missing', False),
-                        'graded_at': submission.get('graded_at'),
-                        'preview_url': submission.get('preview_url'),
-                        'attachments': submission.get('attachments', []),
-                        'user': submission.get('user', {'id': submission.get('user_id'), 'name': f"User {submission.get('user_id')}"})
-                    }
-                    formatted_submissions.append(formatted_submission)
-                
-                # Get course and assignment info
-                course_info = self.get_course_info(course_id)
-                assignment_info = self.get_assignment_info(course_id, assignment_id)
-                
-                return {
-                    'success': True,
-                    'submissions': formatted_submissions,
-                    'course': course_info,
-                    'assignment': assignment_info,
-                    'total_count': len(formatted_submissions)
-                }
-            else:
-                logger.error(f"Canvas API error: {response.status_code} - {response.text}")
-                return {
-                    'success': False,
-                    'message': f'Canvas API error: {response.status_code}',
-                    'submissions': []
-                }
-                
+                submissions_data = _response_json(response)
+                submissions_data.extend(self._fetch_remaining_pages_sync(response))
+                return self._submissions_success(
+                    submissions_data,
+                    self.get_course_info(course_id),
+                    self.get_assignment_info(course_id, assignment_id)
+                )
+            return self._submissions_error(response)
         except Exception as e:
-            logger.error(f"Error fetching submissions: {e}")
-            return {
-                'success': False,
-                'message': f'Error fetching submissions: {str(e)}',
-                'submissions': []
-            }
+            return self._submissions_failure(e)
+    
+    async def get_submissions_for_assignment_async(self, course_id: int, assignment_id: int, include: List[str] = None) -> Dict[str, Any]:
+        """
+        Get submissions for a specific assignment from Canvas API.
+        
+        The submissions, course and assignment requests are issued concurrently,
+        so the call takes about one round-trip instead of three. Requests go
+        through the service's pooled async client, so repeated calls from the
+        same event loop reuse its connections; close it with aclose().
+        
+        Args:
+            course_id: Canvas course ID
+            assignment_id: Canvas assignment ID  
+            include: List of additional data to include (e.g., ['user', 'attachments'])
+            
+        Returns:
+            Dictionary with success status and submissions data
+        """
+        client = self._get_async_client()
+        try:
+            url, params = self._submissions_request(course_id, assignment_id, include)
+            
+            # Make the API requests together on the pooled connections
+            response, course_response, assignment_response = await asyncio.gather(
+                client.get(url, params=params),
+                client.get(f'/api/v1/courses/{course_id}'),
+                client.get(f'/api/v1/courses/{course_id}/assignments/{assignment_id}'),
+                return_exceptions=True
+            )
+            if isinstance(response, BaseException):
+                raise response
             
+            if response.status_code == 200:
+                submissions_data = _response_json(response)
+                submissions_data.extend(await self._fetch_remaining_pages(client, response))
+                return self._submissions_success(
+                    submissions_data,
+                    self._course_info_from_response(course_id, course_response),
+                    self._assignment_info_from_response(assignment_id, assignment_response)
+                )
+            return self._submissions_error(response)
+        except Exception as e:
+            return self._submissions_failure(e)
+    
+    @staticmethod
+    def _submissions_request(course_id: int, assignment_id: int, include: Optional[List[str]]) -> Tuple[str, Dict[str, Any]]:
+        """URL and query parameters for an assignment's submission list."""
+        url = f'/api/v1/courses/{course_id}/assignments/{assignment_id}/submissions'
+        
+        # Canvas returns 10 items per page by default
+        params = {'per_page': _PER_PAGE}
+        if include:
+            params['include[]'] = include
+        return url, params
+    
+    @staticmethod
+    def _submissions_success(submissions_data: List[Dict[str, Any]], course_info: Dict[str, Any],
+                             assignment_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Format fetched submissions for our frontend."""
+        formatted_submissions = [_format_submission(submission) for submission in submissions_data]
+        return {
+            'success': True,
+            'submissions': formatted_submissions,
+            'course': course_info,
+            'assignment': assignment_info,
+            'total_count': len(formatted_submissions)
+        }
+    
+    @staticmethod
+    def _submissions_error(response: httpx.Response) -> Dict[str, Any]:
+        """Result for a submission list request Canvas rejected."""
+        logger.error(f"Canvas API error: {response.status_code} - {response.text}")
+        return {
+            'success': False,
+            'message': f'Canvas API error: {response.status_code}',
+            'submissions': []
+        }
+    
+    @staticmethod
+    def _submissions_failure(error: Exception) -> Dict[str, Any]:
+        """Result for a submission fetch that raised."""
+        logger.error(f"Error fetching submissions: {error}")
+        return {
+            'success': False,
+            'message': f'Error fetching submissions: {str(error)}',
+            'submissions': []
+        }
+    
+    def _fetch_remaining_pages_sync(self, first_response: httpx.Response) -> List[Any]:
+        """Fetch the pages after first_response on the sync client, following Link headers."""
+        items = []
+        next_url = first_response.links.get('next', {}).get('url')
+        while next_url:
+            response = self.client.get(next_url)
+            response.raise_for_status()
+            items.extend(_response_json(response))
+            next_url = response.links.get('next', {}).get('url')
+        return items
+    
+    @staticmethod
+    async def _fetch_remaining_pages(client: httpx.AsyncClient, first_response: httpx.Response) -> List[Any]:
+        """
+        Fetch the pages after first_response by following Canvas's Link headers.
+        
+        When the links give numbered next and last pages, all remaining pages are
+        requested at once; otherwise (e.g. bookmark pagination) they are followed
+        one at a time.
+        """
+        next_url = first_response.links.get('next', {}).get('url')
+        if not next_url:
+            return []
+        
+        items = []
+        last_url = first_response.links.get('last', {}).get('url')
+        page_urls = _numbered_page_urls(next_url, last_url) if last_url else None
+        if page_urls:
+            for response in await asyncio.gather(*(client.get(page_url) for page_url in page_urls)):
+                response.raise_for_status()
+                items.extend(_response_json(response))
+            return items
+        
+        while next_url:
+            response = await client.get(next_url)
+            response.raise_for_status()
+            items.extend(_response_json(response))
+            next_url = response.links.get('next', {}).get('url')
+        return items
+    
     def get_course_info(self, course_id: int) -> Dict[str, Any]:
         """Get course information from Canvas API."""
         try:
-            url = f'{self.canvas_url}/api/v1/courses/{course_id}'
-            response = requests.get(url, headers=self.headers)
+            url = f'/api/v1/courses/{course_id}'
+            response = self.client.get(url)
+        except Exception as e:
+            response = e
+        return self._course_info_from_response(course_id, response)
+    
+    @staticmethod
+    def _course_info_from_response(course_id: int, response) -> Dict[str, Any]:
+        """Build course info from a course response, or the exception raised fetching it."""
+        try:
+            if isinstance(response, BaseException):
+                raise response
             
             if response.status_code == 200:
-                course_data = response.json()
+                course_data = _response_json(response)
                 return {
                     'id': course_data.get('id'),
                     'name': course_data.get('name', 'Unknown Course')
@@ -131,11 +326,21 @@ class CanvasGradingService:
     def get_assignment_info(self, course_id: int, assignment_id: int) -> Dict[str, Any]:
         """Get assignment information from Canvas API."""
         try:
-            url = f'{self.canvas_url}/api/v1/courses/{course_id}/assignments/{assignment_id}'
-            response = requests.get(url, headers=self.headers)
+            url = f'/api/v1/courses/{course_id}/assignments/{assignment_id}'
+            response = self.client.get(url)
+        except Exception as e:
+            response = e
+        return self._assignment_info_from_response(assignment_id, response)
+    
+    @staticmethod
+    def _assignment_info_from_response(assignment_id: int, response) -> Dict[str, Any]:
+        """Build assignment info from an assignment response, or the exception raised fetching it."""
+        try:
+            if isinstance(response, BaseException):
+                raise response
             
             if response.status_code == 200:
-                assignment_data = response.json()
+                assignment_data = _response_json(response)
                 return {
                     'id': assignment_data.get('id'),
                     'name': assignment_data.get('name', 'Unknown Assignment')
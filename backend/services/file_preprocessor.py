@@ -3,12 +3,14 @@ File preprocessor for extracting text from various file formats.
 """
 
 import os
+import hashlib
 import logging
 import tempfile
 from pathlib import Path
 import re
 import shutil
 import traceback
+import threading
 
 # PDF processing
 try:
@@ -30,23 +32,67 @@ except ImportError:
     Image = None
     pytesseract = None
 
+# Persistent in-process Tesseract engine
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Question numbers ("1. ") at the start of a line, used to split a question paper.
+# Only spaces and tabs are consumed after the number, so a bare "3." line can't
+# swallow the newline that starts the next question.
+_Q_SPLIT = re.compile(r'(?:^|\n)[ \t]*\d+\.(?=\s|$)[ \t]*')
+
+# One tesserocr engine per thread: an engine is not safe to share between
+# threads, and keeping it loaded avoids a tesseract process per image
+_tess_local = threading.local()
+
+def _get_tess_api():
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        tessdata_prefix = os.getenv("TESSDATA_PREFIX")
+        if tessdata_prefix:
+            api = tesserocr.PyTessBaseAPI(path=tessdata_prefix, lang='eng')
+        else:
+            api = tesserocr.PyTessBaseAPI(lang='eng')
+        _tess_local.api = api
+    return api
+
+# Placeholder results for missing libraries or failed extractions; these are
+# not cached so the file is retried once the problem is fixed
+_UNCACHEABLE_PREFIXES = (
+    "[Error extracting",
+    "[PDF extraction not available",
+    "[DOCX extraction not available",
+    "[OCR not available",
+)
+
 class FilePreprocessor:
     """Process files and extract text content."""
     
-    def __init__(self, custom_output_path=None, save_ocr_files=False):
+    def __init__(self, custom_output_path=None, save_ocr_files=False, cache_dir=None):
         """
         Initialize the file preprocessor.
         
         Args:
             custom_output_path: Optional custom path to save processed files
             save_ocr_files: Whether to save OCR results
+            cache_dir: Directory for cached extraction results (default: under
+                custom_output_path, or the system temp directory)
         """
         self.custom_output_path = custom_output_path
         self.save_ocr_files = save_ocr_files
         
+        if cache_dir:
+            self.cache_dir = Path(cache_dir)
+        elif custom_output_path:
+            self.cache_dir = Path(custom_output_path) / ".extract_cache"
+        else:
+            self.cache_dir = Path(tempfile.gettempdir()) / "scorepal_extract"
+        
         # Create output directory if needed
         if self.custom_output_path:
             os.makedirs(self.custom_output_path, exist_ok=True)
@@ -70,36 +116,78 @@ class FilePreprocessor:
             
             extension = file_path.suffix.lower()
             
+            # Reuse the text from an earlier run if the file hasn't changed
+            cache_file = self._get_cache_file(file_path, extension)
+            if cache_file is not None:
+                cached = self._read_cache_file(cache_file)
+                if cached is not None:
+                    return cached
+            
             # Process based on file extension
             if extension in ['.pdf']:
-                return self._extract_text_from_pdf(file_path)
+                text = self._extract_text_from_pdf(file_path)
             elif extension in ['.docx', '.doc']:
-                return self._extract_text_from_docx(file_path)
+                text = self._extract_text_from_docx(file_path)
             elif extension in ['.txt', '.md', '.csv']:
-                return self._extract_text_from_text_file(file_path)
+                text = self._extract_text_from_text_file(file_path)
             elif extension in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']:
-                return self._extract_text_from_image(file_path)
+                text = self._extract_text_from_image(file_path)
             else:
                 logger.warning(f"Unsupported file format: {extension}")
                 return f"[Unsupported file format: {extension}]"
+            
+            if cache_file is not None and not text.startswith(_UNCACHEABLE_PREFIXES):
+                self._write_cache_file(cache_file, text)
+            return text
         
         except Exception as e:
             logger.error(f"Error extracting text from {file_path}: {str(e)}")
             logger.error(traceback.format_exc())
             return f"[Error extracting text: {str(e)}]"
     
+    def _get_cache_file(self, file_path, extension):
+        """Return the cache entry for a file keyed by its path, mtime and size, or None."""
+        try:
+            stat = file_path.stat()
+            key = f"{file_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{extension}"
+        except OSError as e:
+            logger.warning(f"Extraction cache lookup failed for {file_path}: {e}")
+            return None
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / f"{digest}.txt"
+    
+    def _read_cache_file(self, cache_file):
+        """Return the cached text, or None on a cache miss."""
+        try:
+            return cache_file.read_bytes().decode('utf-8')
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Failed to read extraction cache {cache_file}: {e}")
+            return None
+    
+    def _write_cache_file(self, cache_file, text):
+        """Store extracted text in the cache, replacing the entry atomically."""
+        tmp_file = cache_file.with_name(f"{cache_file.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file.write_bytes(text.encode('utf-8'))
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to cache extraction to {cache_file}: {e}")
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
+    
     def _extract_text_from_pdf(self, file_path):
         """Extract text from PDF file."""
         if fitz is None:
             return "[PDF extraction not available: PyMuPDF not installed]"
         
         try:
-            text = ""
             with fitz.open(file_path) as doc:
-                for page in doc:
-                    text += page.get_text()
-            
-            return text
+                return "".join(page.get_text() for page in doc)
         except Exception as e:
             logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
             return f"[Error extracting PDF text: {str(e)}]"
@@ -110,20 +198,16 @@ class FilePreprocessor:
             return "[DOCX extraction not available: python-docx not installed]"
         
         try:
-            text = ""
             doc = docx.Document(file_path)
             
-            for para in doc.paragraphs:
-                text += para.text + "\n"
+            parts = [para.text + "\n" for para in doc.paragraphs]
             
             # Also extract text from tables
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+                    parts.append("".join(cell.text + " " for cell in row.cells) + "\n")
             
-            return text
+            return "".join(parts)
         except Exception as e:
             logger.error(f"Error extracting text from DOCX {file_path}: {str(e)}")
             return f"[Error extracting DOCX text: {str(e)}]"
@@ -139,12 +223,17 @@ class FilePreprocessor:
     
     def _extract_text_from_image(self, file_path):
         """Extract text from image using OCR."""
-        if Image is None or pytesseract is None:
+        if tesserocr is None and pytesseract is None:
             return "[OCR not available: PIL or pytesseract not installed]"
         
         try:
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image)
+            if tesserocr is not None:
+                api = _get_tess_api()
+                api.SetImageFile(str(file_path))
+                text = api.GetUTF8Text()
+            else:
+                # Pass the path so tesseract reads the file itself, skipping a PIL decode
+                text = pytesseract.image_to_string(str(file_path))
             
             # Save OCR results if requested
             if self.save_ocr_files and self.custom_output_path:
@@ -168,16 +257,17 @@ class FilePreprocessor:
         if not question_text:
             return {}
         
-        # Extract questions using a simple pattern
-        questions = re.findall(r'\d+\.\s+(.+?)(?=\d+\.\s+|\Z)', question_text + '999. ')
+        # Split on the question numbers; the first segment is any text before question 1
+        questions = [q.strip() for q in _Q_SPLIT.split(question_text)[1:]]
+        questions = [q for q in questions if q]
         
         # Create a basic answer key structure
         answer_key = {
             "questions": [
-                {"question_number": i+1, "question_text": q.strip(), "points": 10}
-                for i, q in enumerate(questions) if q.strip()
+                {"question_number": i+1, "question_text": q, "points": 10}
+                for i, q in enumerate(questions)
             ],
-            "total_points": len(questions) * 10 if questions else 0
+            "total_points": len(questions) * 10
         }
         
         return answer_key 
\ No newline at end of file
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for following Canvas Link-header pagination in the Canvas grading service.
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+import httpx
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.canvas_service import CanvasGradingService, _numbered_page_urls
+
+BASE_URL = "https://canvas.test"
+SUBMISSIONS_PATH = "/api/v1/courses/1/assignments/2/submissions"
+
+def _link(url, rel):
+    return f'<{url}>; rel="{rel}"'
+
+def _numbered_handler(page_count, requested):
+    """Serve page_count pages of submissions linked by page number, recording each request."""
+    def handler(request):
+        path = request.url.path
+        if path == "/api/v1/courses/1":
+            return httpx.Response(200, json={"id": 1, "name": "Networks"})
+        if path == "/api/v1/courses/1/assignments/2":
+            return httpx.Response(200, json={"id": 2, "name": "Homework 1"})
+        
+        page = int(request.url.params.get("page", "1"))
+        requested.append(page)
+        links = []
+        if page < page_count:
+            links.append(_link(f"{BASE_URL}{SUBMISSIONS_PATH}?page={page + 1}&per_page=100", "next"))
+        links.append(_link(f"{BASE_URL}{SUBMISSIONS_PATH}?page={page_count}&per_page=100", "last"))
+        body = [{"id": page * 10 + i, "user_id": page * 10 + i} for i in range(2)]
+        return httpx.Response(200, json=body, headers={"Link": ", ".join(links)})
+    return handler
+
+def _bookmark_handler(bookmarks, requested):
+    """Serve pages chained by opaque bookmarks, with no "last" link, like Canvas does for large lists."""
+    def handler(request):
+        bookmark = request.url.params.get("page", "first")
+        requested.append(bookmark)
+        index = bookmarks.index(bookmark)
+        headers = {}
+        if index + 1 < len(bookmarks):
+            headers["Link"] = _link(f"{BASE_URL}{SUBMISSIONS_PATH}?page={bookmarks[index + 1]}", "next")
+        return httpx.Response(200, content=json.dumps([{"id": bookmark}]), headers=headers)
+    return handler
+
+def _service(handler):
+    service = CanvasGradingService(BASE_URL, "token", "gemini-key")
+    service.client.close()
+    service.client = httpx.Client(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+    service._async_client = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+    return service
+
+def _fetch_remaining(handler):
+    async def fetch():
+        async with httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(handler)) as client:
+            first = await client.get(SUBMISSIONS_PATH)
+            return await CanvasGradingService._fetch_remaining_pages(client, first)
+    return asyncio.run(fetch())
+
+def test_numbered_page_urls():
+    urls = _numbered_page_urls(f"{BASE_URL}/x?page=2&per_page=100", f"{BASE_URL}/x?page=4&per_page=100")
+    assert [url.params["page"] for url in urls] == ["2", "3", "4"]
+    assert all(url.params["per_page"] == "100" for url in urls)
+    assert _numbered_page_urls(f"{BASE_URL}/x?page=bookmark:abc", f"{BASE_URL}/x?page=bookmark:xyz") is None
+
+def test_numbered_pages_are_all_fetched():
+    requested = []
+    items = _fetch_remaining(_numbered_handler(3, requested))
+    assert sorted(requested) == [1, 2, 3]
+    assert [item["id"] for item in items] == [20, 21, 30, 31]
+
+def test_bookmark_pages_are_followed_until_no_next_link():
+    """Without numbered pages the next links are followed, stopping at the page with none."""
+    requested = []
+    items = _fetch_remaining(_bookmark_handler(["first", "bookmark:b", "bookmark:c"], requested))
+    assert requested == ["first", "bookmark:b", "bookmark:c"]
+    assert [item["id"] for item in items] == ["bookmark:b", "bookmark:c"]
+
+def test_single_page_has_nothing_remaining():
+    requested = []
+    assert _fetch_remaining(_numbered_handler(1, requested)) == []
+    assert requested == [1]
+
+def test_sync_and_async_results_match():
+    requested = []
+    service = _service(_numbered_handler(3, requested))
+    try:
+        sync_result = service.get_submissions_for_assignment(1, 2)
+        
+        async def fetch_async():
+            async with service:
+                return await service.get_submissions_for_assignment_async(1, 2)
+        
+        async_result = asyncio.run(fetch_async())
+    finally:
+        service.close()
+    
+    assert sync_result == async_result
+    assert sync_result["success"]
+    assert sync_result["total_count"] == 6
+    assert sync_result["course"] == {"id": 1, "name": "Networks"}
+    assert sync_result["assignment"] == {"id": 2, "name": "Homework 1"}
+    assert sync_result["submissions"][0]["user"] == {"id": 10, "name": "User 10"}
+
+def test_sync_call_inside_event_loop_still_works():
+    """The sync method keeps working when called from async code."""
+    service = _service(_numbered_handler(2, []))
+    
+    async def call_sync():
+        return service.get_submissions_for_assignment(1, 2)
+    
+    try:
+        result = asyncio.run(call_sync())
+    finally:
+        service.close()
+    assert result["success"]
+    assert result["total_count"] == 4
+
+def test_async_context_closes_both_clients():
+    service = _service(_numbered_handler(1, []))
+    async_client = service._async_client
+    
+    async def fetch():
+        async with service:
+            return await service.get_submissions_for_assignment_async(1, 2)
+    
+    assert asyncio.run(fetch())["success"]
+    assert service.client.is_closed
+    assert async_client.is_closed
+    assert service._async_client is None
+
+if __name__ == "__main__":
+    print("🧪 Testing Canvas pagination")
+    print("=" * 50)
+    test_numbered_page_urls()
+    test_numbered_pages_are_all_fetched()
+    test_bookmark_pages_are_followed_until_no_next_link()
+    test_single_page_has_nothing_remaining()
+    test_sync_and_async_results_match()
+    test_sync_call_inside_event_loop_still_works()
+    test_async_context_closes_both_clients()
+    print("✅ All Canvas pagination tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for question splitting and the extraction cache in services/file_preprocessor.py.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.file_preprocessor import FilePreprocessor, _Q_SPLIT
+
+QUESTION_PAPER = """CMPE 148 Homework 1
+Answer all questions. Version 2.5 of the notes applies.
+1. Define latency and give 2. examples.
+  2.  Compare TCP with UDP.
+3.
+10. Explain the 3. way handshake.
+"""
+
+def test_questions_split_on_line_leading_numbers():
+    """Only numbers that start a line begin a question; "2." mid-sentence stays in the text."""
+    parts = _Q_SPLIT.split(QUESTION_PAPER)
+    assert parts[0].startswith("CMPE 148 Homework 1")
+    assert [part.strip() for part in parts[1:]] == [
+        "Define latency and give 2. examples.",
+        "Compare TCP with UDP.",
+        "",
+        "Explain the 3. way handshake."
+    ]
+
+def test_answer_key_skips_empty_questions():
+    with tempfile.TemporaryDirectory() as directory:
+        answer_key = FilePreprocessor(cache_dir=directory)._generate_answer_key(QUESTION_PAPER)
+    assert [q["question_text"] for q in answer_key["questions"]] == [
+        "Define latency and give 2. examples.",
+        "Compare TCP with UDP.",
+        "Explain the 3. way handshake."
+    ]
+    assert [q["question_number"] for q in answer_key["questions"]] == [1, 2, 3]
+    assert answer_key["total_points"] == 30
+
+def test_question_at_start_of_text():
+    parts = _Q_SPLIT.split("1. First\n2. Second")
+    assert [part.strip() for part in parts[1:]] == ["First", "Second"]
+
+def test_cache_hit_reuses_extracted_text():
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "answer.txt"
+        source.write_text("Réponse ✓", encoding="utf-8")
+        preprocessor = FilePreprocessor(cache_dir=Path(directory) / "cache")
+        
+        assert preprocessor.extract_text_from_file(source) == "Réponse ✓"
+        cache_file = preprocessor._get_cache_file(source, ".txt")
+        assert cache_file.read_text(encoding="utf-8") == "Réponse ✓"
+        
+        # A second extraction is answered from the cache entry, not the file
+        cache_file.write_text("from cache", encoding="utf-8")
+        assert preprocessor.extract_text_from_file(source) == "from cache"
+
+def test_stale_mtime_misses_the_cache():
+    """Changing a file, even to the same size, gives it a new cache entry."""
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "answer.txt"
+        source.write_text("first", encoding="utf-8")
+        preprocessor = FilePreprocessor(cache_dir=Path(directory) / "cache")
+        assert preprocessor.extract_text_from_file(source) == "first"
+        first_entry = preprocessor._get_cache_file(source, ".txt")
+        
+        stat = source.stat()
+        source.write_text("again", encoding="utf-8")
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        assert preprocessor._get_cache_file(source, ".txt") != first_entry
+        assert preprocessor.extract_text_from_file(source) == "again"
+
+def test_failed_extractions_are_not_cached():
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "scan.pdf"
+        source.write_bytes(b"not a pdf")
+        preprocessor = FilePreprocessor(cache_dir=Path(directory) / "cache")
+        
+        text = preprocessor.extract_text_from_file(source)
+        assert text.startswith("[")
+        assert not preprocessor._get_cache_file(source, ".pdf").exists()
+
+if __name__ == "__main__":
+    print("🧪 Testing file preprocessor")
+    print("=" * 50)
+    test_questions_split_on_line_leading_numbers()
+    test_answer_key_skips_empty_questions()
+    test_question_at_start_of_text()
+    test_cache_hit_reuses_extracted_text()
+    test_stale_mtime_misses_the_cache()
+    test_failed_extractions_are_not_cached()
+    print("✅ All file preprocessor tests passed")
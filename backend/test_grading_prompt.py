@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the grading prompt templates and the rubric JSON embedded in prompts.
+"""
+
+import os
+import sys
+import json
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from prompts.grading_prompt import (
+    GRADING_PROMPT_PREFIX, _SUBMISSION_TEMPLATE, _STRICTNESS_LEVELS, _STRICTNESS_TERMS,
+    _TEMPLATES, _specialize_template, get_grading_prompt, get_grading_prompt_parts
+)
+from prompts.json_utils import dumps_rubric
+
+RUBRIC = {
+    "name": "Rúbrica de redes — «TCP/IP»",
+    "criteria": [
+        {"name": "Análisis {detallado}", "max_points": 10, "levels": [{"level": "Très bien", "points": 10}]},
+        {"name": "代码质量", "max_points": 5.5, "weight": None}
+    ]
+}
+
+FIELDS = {
+    "question_text": "Explain {x} and the }{ edge case.",
+    "answer_key": "Uses {0} and {name} literally, ñ included.",
+    "rubric_json": dumps_rubric(RUBRIC),
+    "submission": "print(f'{value!r}') # ✓"
+}
+
+def _filled_in_one_pass(strictness_level):
+    """The submission part filled directly from _SUBMISSION_TEMPLATE, without specializing."""
+    return _SUBMISSION_TEMPLATE.format_map({
+        **FIELDS,
+        "strictness_desc": _STRICTNESS_TERMS[int(strictness_level)] if strictness_level in _STRICTNESS_LEVELS else "moderate",
+        "strictness_level": strictness_level,
+        "min_score_pct": 95 - (strictness_level * 5),
+        "max_score_pct": 100 - (strictness_level * 2)
+    })
+
+def test_fill_matches_one_pass_format():
+    """Every strictness level fills to the same text as formatting the template directly."""
+    for level in (0, 3, 5, -1, 6, 2.0, True):
+        _, submission_part = get_grading_prompt_parts(
+            FIELDS["question_text"], FIELDS["answer_key"], FIELDS["submission"], RUBRIC, level
+        )
+        assert submission_part == _filled_in_one_pass(level)
+
+def test_templates_match_one_pass_fill():
+    """Every per-level template fills to the same text as the unspecialized template."""
+    assert len(_TEMPLATES) == len(_STRICTNESS_TERMS)
+    for level in _STRICTNESS_LEVELS:
+        assert _TEMPLATES[level] == _specialize_template(level)
+        assert _TEMPLATES[level].format_map(FIELDS) == _filled_in_one_pass(level)
+
+def test_out_of_range_levels_are_specialized_on_the_fly():
+    """Levels without a prebuilt template are filled on the fly and read as "moderate"."""
+    assert 9 not in _TEMPLATES
+    _, submission_part = get_grading_prompt_parts("Q", "K", "S", RUBRIC, 9)
+    assert "moderate" in submission_part
+
+def test_braces_in_inputs_are_kept_literally():
+    """Braces in the question, answer key and submission are not treated as fields."""
+    prefix, submission_part = get_grading_prompt_parts(
+        FIELDS["question_text"], FIELDS["answer_key"], FIELDS["submission"], RUBRIC, 3
+    )
+    assert prefix == GRADING_PROMPT_PREFIX
+    for value in FIELDS.values():
+        assert value in submission_part
+    assert get_grading_prompt(FIELDS["question_text"], FIELDS["answer_key"], FIELDS["submission"], RUBRIC, 3) == prefix + submission_part
+
+def test_missing_answer_key_uses_default_text():
+    _, submission_part = get_grading_prompt_parts("Q", "", "S", RUBRIC, 3)
+    assert "No specific answer key provided. Use your expert judgment." in submission_part
+
+def test_rubric_dump_is_reused_until_edited():
+    """A repeat call is served from the cache and an edited rubric is not."""
+    assert dumps_rubric(RUBRIC) is dumps_rubric(json.loads(json.dumps(RUBRIC)))
+    edited = json.loads(json.dumps(RUBRIC))
+    edited["criteria"][1]["max_points"] = 6
+    assert dumps_rubric(edited) != dumps_rubric(RUBRIC)
+    assert json.loads(dumps_rubric(edited)) == edited
+
+def test_non_ascii_rubric_matches_json_dumps():
+    """The rubric block is exactly json.dumps(indent=2), \\u-escapes included."""
+    assert dumps_rubric(RUBRIC) == json.dumps(RUBRIC, indent=2)
+    assert "\\u00fa" in dumps_rubric(RUBRIC)
+    assert json.dumps(RUBRIC, indent=2) in get_grading_prompt("Q", "K", "S", RUBRIC, 3)
+
+if __name__ == "__main__":
+    print("🧪 Testing grading prompt templates")
+    print("=" * 50)
+    test_fill_matches_one_pass_format()
+    test_templates_match_one_pass_fill()
+    test_out_of_range_levels_are_specialized_on_the_fly()
+    test_braces_in_inputs_are_kept_literally()
+    test_missing_answer_key_uses_default_text()
+    test_rubric_dump_is_reused_until_edited()
+    test_non_ascii_rubric_matches_json_dumps()
+    print("✅ All grading prompt tests passed")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for PDF text cleaning and the extraction caches in preprocessing_v2.py.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import preprocessing_v2
+from preprocessing_v2 import FilePreprocessor, _file_fingerprint
+
+def _preprocessor(cache_dir):
+    return FilePreprocessor(connect_db=False, cache_dir=str(cache_dir))
+
+def test_clean_pdf_page():
+    with tempfile.TemporaryDirectory() as directory:
+        preprocessor = _preprocessor(directory)
+        page = "Page 3 of 10\n  The   well-\nknown   result\tholds.\n\nPage 4\nCo- operate  "
+        assert preprocessor._clean_pdf_page(page) == "The wellknown result holds. Cooperate"
+        assert preprocessor._clean_pdf_page("Page 7 of 7\n \n") == ""
+
+def test_clean_pdf_text_keeps_pages_apart():
+    """Pages are cleaned separately and joined with blank lines instead of merged into one line."""
+    with tempfile.TemporaryDirectory() as directory:
+        preprocessor = _preprocessor(directory)
+        text = (
+            "Page 1:\nIntro-\nduction to net-\nworks\n\n"
+            "Page 2:\n\n\n\n"
+            "Page 3:\nRésumé — TCP { handshake }\n\n"
+        )
+        assert preprocessor._clean_pdf_text(text) == (
+            ": Introduction to networks\n\n"
+            ":\n\n"
+            ": Résumé — TCP { handshake }"
+        )
+        assert preprocessor._clean_pdf_text("") == ""
+
+def test_fingerprint_covers_the_whole_file():
+    """Files that differ only in the middle get different fingerprints."""
+    with tempfile.TemporaryDirectory() as directory:
+        head, tail = b"%PDF-1.7\n" + b"a" * 3_000_000, b"z" * 3_000_000
+        first, second, copy = (Path(directory) / name for name in ("first.pdf", "second.pdf", "copy.pdf"))
+        first.write_bytes(head + b"student one" + tail)
+        second.write_bytes(head + b"student two" + tail)
+        copy.write_bytes(first.read_bytes())
+        
+        assert _file_fingerprint(str(first)) != _file_fingerprint(str(second))
+        assert _file_fingerprint(str(first)) == _file_fingerprint(str(copy))
+
+def test_stale_mtime_misses_the_memo():
+    """An edited file is extracted again even when its size is unchanged."""
+    with tempfile.TemporaryDirectory() as directory:
+        preprocessor = _preprocessor(Path(directory) / "cache")
+        source = Path(directory) / "submission.txt"
+        source.write_text("first answer ✓", encoding="utf-8")
+        assert preprocessor.extract_text_from_file(str(source)) == "first answer ✓"
+        
+        stat = source.stat()
+        source.write_text("other answer ✓", encoding="utf-8")
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert preprocessor.extract_text_from_file(str(source)) == "other answer ✓"
+        
+        # Same path, size and mtime is served from the memo without reading the file
+        source.write_text("other answer ✗", encoding="utf-8")
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert preprocessor.extract_text_from_file(str(source)) == "other answer ✓"
+        assert preprocessor.extract_text_from_file(str(source), cache=False) == "other answer ✗"
+
+def test_disk_cache_is_shared_by_identical_content():
+    with tempfile.TemporaryDirectory() as directory:
+        preprocessor = _preprocessor(Path(directory) / "cache")
+        first, second = Path(directory) / "a.docx", Path(directory) / "b.docx"
+        first.write_bytes(b"same bytes")
+        second.write_bytes(b"same bytes")
+        
+        entry = preprocessor._get_cache_file(str(first), ".docx")
+        assert entry == preprocessor._get_cache_file(str(second), ".docx")
+        preprocessor._write_cache_file(entry, "Texte extrait ✓")
+        assert preprocessor._read_cache_file(entry) == "Texte extrait ✓"
+        
+        second.write_bytes(b"new bytes!")
+        assert preprocessor._get_cache_file(str(second), ".docx") != entry
+
+def test_disk_cache_prunes_least_recently_used():
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = Path(directory) / "cache"
+        preprocessor = _preprocessor(cache_dir)
+        cache_dir.mkdir()
+        for index in range(5):
+            entry = cache_dir / f"{index}.txt"
+            entry.write_bytes(b"x" * 100)
+            os.utime(entry, (index, index))
+        
+        # Reading the oldest entry marks it as recently used
+        preprocessor._read_cache_file(cache_dir / "0.txt")
+        
+        limit = preprocessing_v2._EXTRACTION_CACHE_MAX_BYTES
+        preprocessing_v2._EXTRACTION_CACHE_MAX_BYTES = 250
+        try:
+            preprocessor._prune_cache_dir()
+        finally:
+            preprocessing_v2._EXTRACTION_CACHE_MAX_BYTES = limit
+        assert sorted(os.listdir(cache_dir)) == ["0.txt", "4.txt"]
+
+if __name__ == "__main__":
+    print("🧪 Testing preprocessing_v2 text cleaning and caches")
+    print("=" * 50)
+    test_clean_pdf_page()
+    test_clean_pdf_text_keeps_pages_apart()
+    test_fingerprint_covers_the_whole_file()
+    test_stale_mtime_misses_the_memo()
+    test_disk_cache_is_shared_by_identical_content()
+    test_disk_cache_prunes_least_recently_used()
+    print("✅ All preprocessing_v2 tests passed")
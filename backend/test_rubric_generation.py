@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for pulling the rubric JSON out of Gemini responses, whole or streamed.
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rubric_generation import (
+    _JsonScanner, _slice_json, _parse_rubric, _read_rubric_stream, _read_rubric_stream_async
+)
+
+RUBRIC_JSON = json.dumps({
+    "total_points": 20,
+    "sections": [
+        {
+            "question": "Q1 {part a}",
+            "max_points": 12,
+            "criteria": [
+                {"name": "Quote \"}\" handling", "points": 6, "description": "Path C:\\temp\\ and a lone { brace"},
+                {"name": "Énoncé clair ✓", "points": 6, "description": "Ünïcode – «quoted» text"}
+            ]
+        },
+        {"question": "Q2", "max_points": 8, "criteria": []}
+    ]
+}, ensure_ascii=False)
+
+RESPONSE = f"Here is the rubric you asked for:\n```json\n{RUBRIC_JSON}\n```\nLet me know if {{anything}} changes."
+
+class _Chunk:
+    """Stand-in for a streamed Gemini chunk."""
+    def __init__(self, text):
+        self.text = text
+
+class _Stream:
+    """Stand-in for the gRPC call behind a streaming response, recording cancellation."""
+    def __init__(self, items):
+        self._items = iter(items)
+        self.cancelled = False
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        assert not self.cancelled, "read after cancel"
+        item = next(self._items)
+        if isinstance(item, Exception):
+            raise item
+        return _Chunk(item)
+    
+    def cancel(self):
+        self.cancelled = True
+
+class _StreamingResponse:
+    """Stand-in for a GenerateContentResponse, which keeps its stream in _iterator."""
+    def __init__(self, items):
+        self._iterator = _Stream(items)
+    
+    def __iter__(self):
+        yield from self._iterator
+    
+    async def __aiter__(self):
+        for chunk in self._iterator:
+            yield chunk
+
+def _pieces(text, size=7):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+def test_braces_and_escaped_quotes_inside_strings():
+    """Braces and escaped quotes inside string values don't end the object early."""
+    assert _slice_json(RESPONSE) == RUBRIC_JSON
+    assert _slice_json('{"a": "}{", "b": {"c": "\\"}"}} tail') == '{"a": "}{", "b": {"c": "\\"}"}}'
+    
+    # An escaped backslash right before the closing quote ends the string
+    assert _slice_json('{"path": "C:\\\\"} {"next": 1}') == '{"path": "C:\\\\"}'
+
+def test_no_object_returns_none():
+    assert _slice_json("no JSON here") is None
+    assert _slice_json('Sure: {"total_points": 20, "note": "}') is None
+
+def test_split_at_every_position():
+    """The scanner finds the same object whichever character a chunk boundary falls on."""
+    for split in range(len(RESPONSE) + 1):
+        scanner = _JsonScanner()
+        first = scanner.feed(RESPONSE[:split])
+        result = first if first is not None else scanner.feed(RESPONSE[split:])
+        assert result == RUBRIC_JSON, split
+
+def test_incomplete_object_returns_none():
+    scanner = _JsonScanner()
+    assert scanner.feed('Sure: {"total_points": 20, "note": "}') is None
+    assert scanner.feed('still open"') is None
+    assert scanner.feed('}') == '{"total_points": 20, "note": "}still open"}'
+
+def test_stream_stops_at_closing_brace():
+    """Reading a stream stops at the rubric's closing brace, before later chunks."""
+    consumed = []
+    closed = []
+    
+    def chunks():
+        try:
+            for start in range(0, len(RESPONSE), 7):
+                consumed.append(start)
+                yield _Chunk(RESPONSE[start:start + 7])
+        finally:
+            closed.append(True)
+    
+    assert _read_rubric_stream(chunks()) == RUBRIC_JSON
+    assert consumed[-1] < RESPONSE.index(RUBRIC_JSON) + len(RUBRIC_JSON)
+    assert closed == [True]
+
+def test_stream_is_cancelled_after_early_return():
+    """The stream behind a response is cancelled once the rubric is read, sync or async."""
+    response = _StreamingResponse(_pieces(RESPONSE))
+    assert _read_rubric_stream(response) == RUBRIC_JSON
+    assert response._iterator.cancelled
+    
+    response = _StreamingResponse(_pieces(RESPONSE))
+    assert asyncio.run(_read_rubric_stream_async(response)) == RUBRIC_JSON
+    assert response._iterator.cancelled
+
+def test_stream_is_cancelled_on_error():
+    response = _StreamingResponse(['{"total_points": ', ConnectionResetError("reset")])
+    try:
+        _read_rubric_stream(response)
+    except ConnectionResetError:
+        pass
+    else:
+        raise AssertionError("expected ConnectionResetError")
+    assert response._iterator.cancelled
+
+def test_parse_non_ascii_rubric():
+    """A rubric with non-ASCII text parses to the same dict as json.loads."""
+    assert _parse_rubric(RESPONSE) == json.loads(RUBRIC_JSON)
+
+def test_parse_without_json_raises():
+    try:
+        _parse_rubric("The model declined to answer.")
+    except ValueError as e:
+        assert "No JSON content" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+if __name__ == "__main__":
+    print("🧪 Testing rubric JSON extraction")
+    print("=" * 50)
+    test_braces_and_escaped_quotes_inside_strings()
+    test_no_object_returns_none()
+    test_split_at_every_position()
+    test_incomplete_object_returns_none()
+    test_stream_stops_at_closing_brace()
+    test_stream_is_cancelled_after_early_return()
+    test_stream_is_cancelled_on_error()
+    test_parse_non_ascii_rubric()
+    test_parse_without_json_raises()
+    print("✅ All rubric JSON extraction tests passed")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazily loaded rubric store and the Rubric serialization caches.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.rubric import Rubric, GradingCriteria
+import rubric_api
+from rubric_api import _LazyRubricStore
+
+def _make_rubric(rubric_id, name):
+    return Rubric(
+        name=name,
+        description="Évaluation des réponses — 评分标准",
+        criteria=[GradingCriteria(name="Clarté ✓", description="Réponse «claire»", max_points=10)],
+        id=rubric_id
+    )
+
+def _write_rubrics(directory):
+    """Write two valid rubric files and one corrupt one, returning their paths by ID."""
+    paths = {}
+    for rubric_id, name in (("rubric_a", "Rubric A"), ("rubric_b", "Rúbrica B")):
+        path = Path(directory) / f"{rubric_id}.json"
+        path.write_text(json.dumps(_make_rubric(rubric_id, name).to_dict(), ensure_ascii=False), encoding="utf-8")
+        paths[rubric_id] = path
+    broken = Path(directory) / "rubric_broken.json"
+    broken.write_text('{"name": "unterminated', encoding="utf-8")
+    paths["rubric_broken"] = broken
+    return paths
+
+def test_rubrics_load_on_first_access():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _LazyRubricStore()
+        store.index(_write_rubrics(directory))
+        
+        # Indexed rubrics count towards the length before any is parsed
+        assert len(store) == 3
+        assert dict.__len__(store) == 0
+        
+        assert "rubric_b" in store
+        assert dict.__len__(store) == 1
+        assert store["rubric_b"].name == "Rúbrica B"
+        assert store.get("rubric_a").description == "Évaluation des réponses — 评分标准"
+        assert store.get("rubric_missing") is None
+
+def test_unreadable_rubric_is_dropped():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _LazyRubricStore()
+        store.index(_write_rubrics(directory))
+        
+        assert "rubric_broken" not in store
+        assert len(store) == 2
+        try:
+            store["rubric_broken"]
+        except KeyError:
+            pass
+        else:
+            raise AssertionError("expected KeyError")
+
+def test_load_all_merges_remaining_rubrics():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _LazyRubricStore()
+        store.index(_write_rubrics(directory))
+        store["rubric_a"]
+        
+        assert store.load_all() == 1
+        assert store.load_all() == 0
+        assert sorted(dict.keys(store)) == ["rubric_a", "rubric_b"]
+        assert len(store) == 2
+
+def test_set_and_delete_override_the_index():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _LazyRubricStore()
+        store.index(_write_rubrics(directory))
+        
+        # An in-memory rubric wins over its file, and re-indexing doesn't bring the file back
+        store["rubric_a"] = _make_rubric("rubric_a", "Edited")
+        store.index({"rubric_a": Path(directory) / "rubric_a.json"})
+        assert store["rubric_a"].name == "Edited"
+        
+        # Deleting works whether or not the rubric was parsed yet
+        del store["rubric_b"]
+        assert "rubric_b" not in store
+        
+        # That miss loaded the remaining files, dropping the unreadable one
+        assert len(store) == 1
+
+def test_rubric_is_found_by_its_stored_id():
+    """A file whose name differs from the rubric ID inside it is found under that ID."""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _write_rubrics(directory)
+        renamed = Path(directory) / "exported copy.json"
+        paths.pop("rubric_b").rename(renamed)
+        paths["exported copy"] = renamed
+        store = _LazyRubricStore()
+        store.index(paths)
+        
+        assert store["rubric_b"].name == "Rúbrica B"
+        assert "exported copy" not in store
+        assert sorted(dict.keys(store)) == ["rubric_a", "rubric_b"]
+
+def test_to_dict_returns_a_copy():
+    rubric = _make_rubric("rubric_a", "Rubric A")
+    data = rubric.to_dict()
+    data["name"] = "Changed by caller"
+    data["extra"] = True
+    assert rubric.to_dict()["name"] == "Rubric A"
+    assert "extra" not in rubric.to_dict()
+
+def test_assignment_invalidates_cached_serializations():
+    """Edits within the same second as the last one still show up."""
+    rubric = _make_rubric("rubric_a", "Rubric A")
+    assert json.loads(rubric.to_json_bytes())["name"] == "Rubric A"
+    
+    rubric.name = "Renamed"
+    rubric.criteria = rubric.criteria + [GradingCriteria(name="Extra", description="", max_points=5)]
+    assert rubric.updated_at == rubric.created_at
+    assert rubric.to_dict()["name"] == "Renamed"
+    assert rubric.to_dict()["total_points"] == 15
+    assert json.loads(rubric.to_json_bytes())["total_points"] == 15
+
+def test_non_ascii_rubric_round_trips():
+    rubric = _make_rubric("rubric_a", "Rúbrica ✓")
+    restored = Rubric.from_dict(json.loads(rubric.to_json_bytes()))
+    assert restored.to_dict() == rubric.to_dict()
+
+def test_update_replaces_the_whole_rubric():
+    """PUT reuses unchanged criteria but still resets omitted fields to their defaults."""
+    with tempfile.TemporaryDirectory() as directory:
+        rubrics_dir = rubric_api.RUBRICS_DIR
+        rubric_api.RUBRICS_DIR = Path(directory)
+        rubric = _make_rubric("rubric_update_test", "Rubric A")
+        rubric.strictness = 0.9
+        rubric_api.RUBRICS[rubric.id] = rubric
+        try:
+            body = rubric.to_dict()
+            body["name"] = "Renamed"
+            updated = asyncio.run(rubric_api.update_rubric(rubric.id, body))["rubric"]
+            assert updated["name"] == "Renamed"
+            assert updated["criteria"] == rubric.to_dict()["criteria"]
+            assert rubric_api.RUBRICS[rubric.id].criteria[0] is rubric.criteria[0]
+            assert rubric.name == "Rubric A"
+            
+            updated = asyncio.run(rubric_api.update_rubric(rubric.id, {"name": "Only a name"}))["rubric"]
+            assert updated["name"] == "Only a name"
+            assert updated["description"] == ""
+            assert updated["strictness"] == 0.5
+            assert updated["criteria"] == []
+            assert updated["created_at"] == rubric.created_at
+            assert json.loads((Path(directory) / f"{rubric.id}.json").read_text(encoding="utf-8")) == updated
+        finally:
+            rubric_api.RUBRICS_DIR = rubrics_dir
+            del rubric_api.RUBRICS[rubric.id]
+
+if __name__ == "__main__":
+    print("🧪 Testing rubric store")
+    print("=" * 50)
+    test_rubrics_load_on_first_access()
+    test_unreadable_rubric_is_dropped()
+    test_load_all_merges_remaining_rubrics()
+    test_set_and_delete_override_the_index()
+    test_rubric_is_found_by_its_stored_id()
+    test_to_dict_returns_a_copy()
+    test_assignment_invalidates_cached_serializations()
+    test_non_ascii_rubric_round_trips()
+    test_update_replaces_the_whole_rubric()
+    print("✅ All rubric store tests passed")